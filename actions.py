@@ -3,15 +3,29 @@ from __future__ import annotations
 from typing import Optional, Tuple, TYPE_CHECKING
 
 import color
+import dice
+from entity import Item
 import exceptions
-import random
+from slotted import Slotted
 
 if TYPE_CHECKING:
     from engine import Engine
-    from entity import Actor, Entity, Item
+    from entity import Actor, Entity
 
 
-class Action:
+# Monsters this close to a fight are woken by the noise.
+NOISE_RADIUS = 6
+
+# Natural attack rolls which always crit or fumble, and the damage multiplier of a crit.
+CRITICAL_ROLL = 20
+FUMBLE_ROLL = 1
+CRITICAL_MULTIPLIER = 2
+
+
+class Action(Slotted):
+    # Subclasses without __slots__ of their own get an instance __dict__ as usual.
+    __slots__ = ("entity",)
+
     def __init__(self, entity: Actor) -> None:
         super().__init__()
         self.entity = entity
@@ -44,12 +58,14 @@ class PickupAction(Action):
         actor_location_y = self.entity.y
         inventory = self.entity.inventory
 
-        for item in self.engine.game_map.items:
-            if actor_location_x == item.x and actor_location_y == item.y:
+        for item in self.engine.game_map.get_entities_at_location(
+            actor_location_x, actor_location_y
+        ):
+            if isinstance(item, Item):
                 if len(inventory.items) >= inventory.capacity:
                     raise exceptions.Impossible("Your inventory is full.")
 
-                self.engine.game_map.entities.remove(item)
+                self.engine.game_map.remove_entity(item)
                 item.parent = self.entity.inventory
                 inventory.items.append(item)
 
@@ -151,17 +167,20 @@ class MeleeAction(ActionWithDirection):
         if not target:
             raise exceptions.Impossible("Nothing to attack.")
 
+        # The sound of a fight wakes up nearby monsters.
+        self.entity.gamemap.wake_within(self.entity.x, self.entity.y, NOISE_RADIUS)
+
         # FTD ACCURACY ROLL: d20 + Strength Modifier
-        attack_roll = random.randint(1, 20)
-        total_attack = attack_roll + self.entity.abilities.str_mod
+        attack_roll = dice.d20(self.engine.rng.stream("combat"))
+        total_attack = attack_roll + self.entity.fighter.stats.attack_bonus
 
         target_ac = target.fighter.armor_class
 
-        if attack_roll == 20:
+        if attack_roll == CRITICAL_ROLL:
             # Natural 20 is a Critical Hit in FTD!
             self.engine.message_log.add_message(f"CRITICAL HIT!", color.health_recovered)
             self.resolve_attack(target, is_crit=True)
-        elif attack_roll == 1:
+        elif attack_roll == FUMBLE_ROLL:
             # Natural 1 is a fumble
             self.engine.message_log.add_message(f"{self.entity.name} fumbles!", color.error)
         elif total_attack >= target_ac:
@@ -178,7 +197,7 @@ class MeleeAction(ActionWithDirection):
         # 2. Roll for damage (calls the random property once)
         damage = self.entity.fighter.power
         if is_crit:
-            damage *= 2
+            damage *= CRITICAL_MULTIPLIER
 
         # 3. Apply the damage
         target.fighter.hp -= damage
@@ -196,7 +215,7 @@ class MovementAction(ActionWithDirection):
         if not self.engine.game_map.in_bounds(dest_x, dest_y):
             # Destination is out of bounds.
             raise exceptions.Impossible("That way is blocked.")
-        if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
+        if not self.engine.game_map.is_walkable(dest_x, dest_y):
             # Destination is blocked by a tile.
             raise exceptions.Impossible("That way is blocked.")
         if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
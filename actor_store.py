@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+
+class ActorStore:
+    """
+    Struct-of-arrays copy of the actors on a GameMap.
+
+    Each actor owns one row in a set of parallel NumPy columns holding its position and
+    combat stats, so bulk questions ("who is within 8 tiles?") can be answered with
+    vectorized expressions instead of Python loops.  The Actor and Fighter objects are
+    still the source of truth, they write through to this store whenever they change.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.max_hp = np.zeros(capacity, dtype=np.int32)
+        self.armor_class = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.in_use = np.zeros(capacity, dtype=bool)
+
+        self.actors: List[Optional[Actor]] = [None] * capacity
+        self.rows: Dict[Actor, int] = {}
+        self.free_rows: List[int] = list(reversed(range(capacity)))
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.actors)
+
+    def _grow(self) -> None:
+        """Double the size of every column."""
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2
+        for name in ("x", "y", "hp", "max_hp", "armor_class", "alive", "in_use"):
+            column = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:old_capacity] = column
+            setattr(self, name, grown)
+        self.actors.extend([None] * old_capacity)
+        self.free_rows.extend(reversed(range(old_capacity, new_capacity)))
+
+    def add(self, actor: Actor) -> None:
+        """Give an actor a row in this store and fill it in."""
+        if actor in self.rows:
+            return
+        if not self.free_rows:
+            self._grow()
+        row = self.free_rows.pop()
+        self.rows[actor] = row
+        self.actors[row] = actor
+        self.in_use[row] = True
+        self.update(actor)
+
+    def remove(self, actor: Actor) -> None:
+        """Release the row owned by an actor."""
+        row = self.rows.pop(actor, None)
+        if row is None:
+            return
+        self.actors[row] = None
+        self.in_use[row] = False
+        self.alive[row] = False
+        self.free_rows.append(row)
+
+    def update(self, actor: Actor) -> None:
+        """Copy every stored column from the actor."""
+        row = self.rows[actor]
+        fighter = actor.fighter
+        self.x[row] = actor.x
+        self.y[row] = actor.y
+        self.hp[row] = fighter.hp
+        self.max_hp[row] = fighter.max_hp
+        self.armor_class[row] = fighter.armor_class
+        self.alive[row] = actor.is_alive
+
+    def set_position(self, actor: Actor, x: int, y: int) -> None:
+        row = self.rows[actor]
+        self.x[row] = x
+        self.y[row] = y
+
+    def set_alive(self, actor: Actor, alive: bool) -> None:
+        self.alive[self.rows[actor]] = alive
+
+    def living_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the x and y arrays of every living actor."""
+        return self.x[self.alive], self.y[self.alive]
+
+    def _select(self, mask: np.ndarray) -> List[Actor]:
+        return [self.actors[row] for row in np.flatnonzero(mask)]  # type: ignore
+
+    def actors_within(self, x: int, y: int, radius: float) -> List[Actor]:
+        """Return the living actors whose euclidean distance to (x, y) is at most radius."""
+        dx = self.x - x
+        dy = self.y - y
+        return self._select(self.alive & (dx * dx + dy * dy <= radius * radius))
+
+    def actors_in_rect(self, x1: int, y1: int, x2: int, y2: int) -> List[Actor]:
+        """Return the living actors inside the half-open rectangle [x1, x2) x [y1, y2)."""
+        return self._select(
+            self.alive
+            & (self.x >= x1)
+            & (self.x < x2)
+            & (self.y >= y1)
+            & (self.y < y2)
+        )
+
+    def actors_below_hp_fraction(self, fraction: float) -> List[Actor]:
+        """Return the living actors whose hp is below the given fraction of max_hp."""
+        return self._select(self.alive & (self.hp < self.max_hp * fraction))
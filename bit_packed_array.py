@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Any, Tuple
+
+import numpy as np  # type: ignore
+
+
+class BitPackedArray:
+    """
+    A 2D boolean array stored at one bit per cell.
+
+    Bits are packed along the second (y) axis with np.packbits, so each row of `bits`
+    holds one map column.  Indexing mirrors a boolean ndarray: `[x, y]` returns a bool,
+    slices unpack only the bytes covering the requested window, and assignment repacks
+    only that window.  `|=` with another BitPackedArray is a plain byte-wise OR.
+    """
+
+    def __init__(self, shape: Tuple[int, int], fill_value: bool = False):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.bits = np.full(
+            (self.shape[0], (self.shape[1] + 7) // 8),
+            0xFF if fill_value else 0,
+            dtype=np.uint8,
+        )
+        if fill_value:
+            self._clear_padding()
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        array = self[:, :]
+        return array if dtype is None else array.astype(dtype)
+
+    def _clear_padding(self) -> None:
+        """Keep the unused bits of the last byte of each column at zero."""
+        extra = self.bits.shape[1] * 8 - self.shape[1]
+        if extra:
+            self.bits[:, -1] &= (0xFF << extra) & 0xFF
+
+    def _normalize(self, key: Any) -> Tuple[slice, Tuple[int, int], bool, bool]:
+        """Return (x index, (y1, y2) bounds, x is scalar, y is scalar) for an index."""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        if len(key) != 2:
+            raise IndexError(f"BitPackedArray only supports 2D indexes, got {key!r}.")
+        x_index, y_index = key
+
+        x_scalar = not isinstance(x_index, slice)
+        if x_scalar:
+            x = int(x_index)
+            if x < 0:
+                x += self.shape[0]
+            if not 0 <= x < self.shape[0]:
+                raise IndexError(f"Index {x} is out of bounds for size {self.shape[0]}.")
+            x_index = slice(x, x + 1)
+
+        y_scalar = not isinstance(y_index, slice)
+        if y_scalar:
+            y = int(y_index)
+            if y < 0:
+                y += self.shape[1]
+            if not 0 <= y < self.shape[1]:
+                raise IndexError(f"Index {y} is out of bounds for size {self.shape[1]}.")
+            y_bounds = (y, y + 1)
+        else:
+            start, stop, step = y_index.indices(self.shape[1])
+            if step != 1:
+                raise IndexError("BitPackedArray does not support strided slices.")
+            y_bounds = (start, max(start, stop))
+        return x_index, y_bounds, x_scalar, y_scalar
+
+    def _unpack(self, x_index: slice, y1: int, y2: int) -> np.ndarray:
+        """Unpack the window [x_index, y1:y2] into a bool array."""
+        byte_window = self.bits[x_index, y1 // 8: (y2 + 7) // 8]
+        offset = y1 % 8
+        return np.unpackbits(byte_window, axis=1)[:, offset: offset + y2 - y1].view(bool)
+
+    def __getitem__(self, key: Any) -> Any:
+        if (
+            isinstance(key, tuple)
+            and len(key) == 2
+            and not isinstance(key[0], slice)
+            and not isinstance(key[1], slice)
+        ):
+            # Fast path for single cell lookups.
+            x, y = int(key[0]), int(key[1])
+            return bool((self.bits[x, y >> 3] >> (7 - (y & 7))) & 1)
+
+        x_index, (y1, y2), x_scalar, y_scalar = self._normalize(key)
+        window = self._unpack(x_index, y1, y2)
+        if x_scalar:
+            window = window[0]
+            return window[0] if y_scalar else window
+        return window[:, 0] if y_scalar else window
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        x_index, (y1, y2), _, y_scalar = self._normalize(key)
+        if y2 <= y1:
+            return
+        byte_y1, byte_y2 = y1 // 8, (y2 + 7) // 8
+        if y1 % 8 == 0 and (y2 % 8 == 0 or y2 == self.shape[1]) and np.ndim(value) == 0:
+            # Byte aligned fill, no need to unpack.
+            self.bits[x_index, byte_y1:byte_y2] = 0xFF if value else 0
+            self._clear_padding()
+            return
+
+        value = np.asarray(value, dtype=bool)
+        if y_scalar and value.ndim == 1:
+            value = value[:, np.newaxis]  # A column of values along the x axis.
+
+        window = np.unpackbits(self.bits[x_index, byte_y1:byte_y2], axis=1)
+        offset = y1 % 8
+        window[:, offset: offset + y2 - y1] = value
+        self.bits[x_index, byte_y1:byte_y2] = np.packbits(window, axis=1)
+        self._clear_padding()
+
+    def __ior__(self, other: Any) -> BitPackedArray:
+        if isinstance(other, BitPackedArray):
+            if other.shape != self.shape:
+                raise ValueError("Can only merge BitPackedArrays with the same shape.")
+            self.bits |= other.bits
+        else:
+            self.bits |= np.packbits(np.asarray(other, dtype=bool), axis=1)
+        return self
+
+    def merge_window(self, x1: int, y1: int, window: np.ndarray) -> None:
+        """OR a boolean window into this array with its top-left corner at (x1, y1)."""
+        x2, y2 = x1 + window.shape[0], y1 + window.shape[1]
+        self[x1:x2, y1:y2] = self[x1:x2, y1:y2] | window
+
+    def clear(self) -> None:
+        """Set every cell to False."""
+        self.bits[...] = 0
+
+    def count(self) -> int:
+        """Return the number of True cells."""
+        return int(np.unpackbits(self.bits).sum())
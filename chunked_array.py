@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Tuple
+
+import numpy as np  # type: ignore
+
+
+class ChunkedArray:
+    """
+    A 2D array split into fixed-size square chunks which are only allocated when written.
+
+    Chunks which were never written to all share one read-only sentinel chunk filled with
+    `fill_value`, so a huge map which is mostly solid rock costs almost nothing.
+
+    Indexing supports what the game uses on its map arrays: `[x, y]` returns a scalar,
+    `[x1:x2, y1:y2]` (or a single slice for the first axis) returns a new ndarray copy,
+    and a field name returns that whole field as an ndarray.  Assignment accepts the
+    same integer and slice indexes and broadcasts the value like NumPy does.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        dtype: Any,
+        fill_value: Any,
+        chunk_size: int = 64,
+    ):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.dtype = np.dtype(dtype)
+        self.fill_value = np.array(fill_value, dtype=self.dtype)
+        self.chunk_size = chunk_size
+        self.chunks: Dict[Tuple[int, int], np.ndarray] = {}
+        self._sentinel = self._make_sentinel()
+
+    def _make_sentinel(self) -> np.ndarray:
+        sentinel = np.full(
+            (self.chunk_size, self.chunk_size), self.fill_value, dtype=self.dtype, order="F"
+        )
+        sentinel.flags.writeable = False
+        return sentinel
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_sentinel"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._sentinel = self._make_sentinel()
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        array = self[:, :]
+        return array if dtype is None else array.astype(dtype)
+
+    def chunk(self, cx: int, cy: int) -> np.ndarray:
+        """Return the chunk at chunk coordinates (cx, cy), which may be the read-only sentinel."""
+        return self.chunks.get((cx, cy), self._sentinel)
+
+    def _writable_chunk(self, cx: int, cy: int) -> np.ndarray:
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None:
+            chunk = self.chunks[cx, cy] = self._sentinel.copy(order="F")
+        return chunk
+
+    def _chunk_extent(self, cx: int, cy: int) -> Tuple[int, int]:
+        """Return the in-bounds width and height of a chunk, edge chunks may be smaller."""
+        size = self.chunk_size
+        return (
+            min(size, self.shape[0] - cx * size),
+            min(size, self.shape[1] - cy * size),
+        )
+
+    def _normalize(self, key: Any) -> Tuple[Tuple[int, int], Tuple[int, int], bool]:
+        """Convert an index into (x1, x2), (y1, y2) bounds and whether it was a scalar index."""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        if len(key) != 2:
+            raise IndexError(f"ChunkedArray only supports 2D indexes, got {key!r}.")
+
+        bounds = []
+        scalar = True
+        for index, size in zip(key, self.shape):
+            if isinstance(index, slice):
+                start, stop, step = index.indices(size)
+                if step != 1:
+                    raise IndexError("ChunkedArray does not support strided slices.")
+                bounds.append((start, max(start, stop)))
+                scalar = False
+            else:
+                index = int(index)
+                if index < 0:
+                    index += size
+                if not 0 <= index < size:
+                    raise IndexError(f"Index {index} is out of bounds for size {size}.")
+                bounds.append((index, index + 1))
+        return bounds[0], bounds[1], scalar
+
+    def _overlapping_chunks(
+        self, x_bounds: Tuple[int, int], y_bounds: Tuple[int, int]
+    ) -> Iterator[Tuple[int, int, slice, slice, slice, slice]]:
+        """Yield each chunk overlapping a region as (cx, cy, chunk slices, region slices)."""
+        size = self.chunk_size
+        x1, x2 = x_bounds
+        y1, y2 = y_bounds
+        for cx in range(x1 // size, (x2 - 1) // size + 1):
+            chunk_x1 = max(x1, cx * size)
+            chunk_x2 = min(x2, (cx + 1) * size)
+            for cy in range(y1 // size, (y2 - 1) // size + 1):
+                chunk_y1 = max(y1, cy * size)
+                chunk_y2 = min(y2, (cy + 1) * size)
+                yield (
+                    cx,
+                    cy,
+                    slice(chunk_x1 - cx * size, chunk_x2 - cx * size),
+                    slice(chunk_y1 - cy * size, chunk_y2 - cy * size),
+                    slice(chunk_x1 - x1, chunk_x2 - x1),
+                    slice(chunk_y1 - y1, chunk_y2 - y1),
+                )
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            return self[:, :][key]
+
+        x_bounds, y_bounds, scalar = self._normalize(key)
+        if scalar:
+            size = self.chunk_size
+            x, y = x_bounds[0], y_bounds[0]
+            return self.chunk(x // size, y // size)[x % size, y % size]
+
+        out = np.empty(
+            (x_bounds[1] - x_bounds[0], y_bounds[1] - y_bounds[0]), dtype=self.dtype, order="F"
+        )
+        if out.size == 0:
+            return out
+        out[...] = self.fill_value
+        if not self.chunks:
+            return out
+        for cx, cy, chunk_xs, chunk_ys, out_xs, out_ys in self._overlapping_chunks(
+            x_bounds, y_bounds
+        ):
+            chunk = self.chunks.get((cx, cy))
+            if chunk is not None:
+                out[out_xs, out_ys] = chunk[chunk_xs, chunk_ys]
+        return out
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        x_bounds, y_bounds, scalar = self._normalize(key)
+        if scalar:
+            size = self.chunk_size
+            x, y = x_bounds[0], y_bounds[0]
+            chunk = self.chunks.get((x // size, y // size))
+            if chunk is None:
+                if bool(value == self.fill_value):
+                    return  # Writing the fill value into an untouched chunk changes nothing.
+                chunk = self._writable_chunk(x // size, y // size)
+            chunk[x % size, y % size] = value
+            return
+
+        region_shape = (x_bounds[1] - x_bounds[0], y_bounds[1] - y_bounds[0])
+        if 0 in region_shape:
+            return
+        value = np.broadcast_to(np.asarray(value, dtype=self.dtype), region_shape)
+
+        for cx, cy, chunk_xs, chunk_ys, value_xs, value_ys in self._overlapping_chunks(
+            x_bounds, y_bounds
+        ):
+            sub_value = value[value_xs, value_ys]
+            if (sub_value == self.fill_value).all():
+                if (cx, cy) not in self.chunks:
+                    continue  # Writing the fill value into an untouched chunk changes nothing.
+                if sub_value.shape == self._chunk_extent(cx, cy):
+                    del self.chunks[cx, cy]  # The whole chunk was reset, share the sentinel again.
+                    continue
+            self._writable_chunk(cx, cy)[chunk_xs, chunk_ys] = sub_value
+
+    def __ior__(self, other: Any) -> ChunkedArray:
+        """In-place union, used to merge boolean layers such as `explored |= visible`."""
+        if isinstance(other, ChunkedArray):
+            if other.shape != self.shape or other.chunk_size != self.chunk_size:
+                raise ValueError("Can only merge ChunkedArrays with the same layout.")
+            if other.fill_value.any():
+                return self.__ior__(other[:, :])
+            # Chunks which were never written on the other side are all False.
+            for key, chunk in other.chunks.items():
+                self._writable_chunk(*key)[...] |= chunk
+            return self
+
+        other = np.asarray(other, dtype=self.dtype)
+        for cx, cy, chunk_xs, chunk_ys, other_xs, other_ys in self._overlapping_chunks(
+            (0, self.shape[0]), (0, self.shape[1])
+        ):
+            sub_other = other[other_xs, other_ys]
+            if sub_other.any():
+                self._writable_chunk(cx, cy)[chunk_xs, chunk_ys] |= sub_other
+        return self
+
+    def allocated_bytes(self) -> int:
+        """Return the memory used by allocated chunks."""
+        return sum(chunk.nbytes for chunk in self.chunks.values())
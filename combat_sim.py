@@ -0,0 +1,152 @@
+"""Monte Carlo melee duels between actor templates, for balancing entity_factories.
+
+Every duel follows MeleeAction: the attacker rolls a d20 plus its attack bonus
+against the defender's armor class, a natural CRITICAL_ROLL always hits for
+CRITICAL_MULTIPLIER times the damage, and a natural FUMBLE_ROLL always misses.
+Damage is the NdS+bonus roll of the attacker's compiled Fighter.stats.  All duels of
+a matchup run side by side as NumPy arrays, one round at a time.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+from actions import CRITICAL_MULTIPLIER, CRITICAL_ROLL, FUMBLE_ROLL
+import dice
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+
+class CombatProfile:
+    """The numbers of an actor which matter in a melee duel."""
+
+    def __init__(self, actor: Actor):
+        fighter = actor.fighter
+        stats = fighter.stats
+        self.name = actor.name
+        self.attack_bonus = stats.attack_bonus
+        self.armor_class = stats.armor_class
+        self.hit_dice = fighter.hit_dice
+        self.max_hp = fighter.max_hp
+        self.damage_number = stats.damage_number
+        self.damage_sides = stats.damage_sides
+        self.damage_bonus = stats.damage_bonus
+
+    def roll_hp(self, generator: np.random.Generator, count: int) -> np.ndarray:
+        """Return the starting hp of `count` copies of this actor."""
+        if self.hit_dice > 0:
+            return dice.roll_batch(self.hit_dice, 8, generator, count=count)
+        return np.full(count, self.max_hp, dtype=np.int64)
+
+    def attack(
+        self, defender: CombatProfile, generator: np.random.Generator, count: int
+    ) -> np.ndarray:
+        """Return the damage of `count` attacks against `defender`, 0 for misses."""
+        attack_roll = generator.integers(1, 21, size=count)
+        critical = attack_roll == CRITICAL_ROLL
+        hit = critical | (
+            (attack_roll != FUMBLE_ROLL)
+            & (attack_roll + self.attack_bonus >= defender.armor_class)
+        )
+        damage = dice.roll_batch(
+            self.damage_number,
+            self.damage_sides,
+            generator,
+            count=count,
+            modifier=self.damage_bonus,
+        )
+        damage[critical] *= CRITICAL_MULTIPLIER
+        return np.where(hit, damage, 0)
+
+
+class DuelResult:
+    """The outcome of many duels between the same two actors."""
+
+    def __init__(self, first: str, second: str, winners: np.ndarray, rounds: np.ndarray):
+        self.first = first
+        self.second = second
+        self.duels = len(winners)
+        self.first_win_rate = float(np.mean(winners == 1))
+        self.second_win_rate = float(np.mean(winners == 2))
+        self.draw_rate = float(np.mean(winners == 0))  # Nobody died within max_rounds.
+        self.first_rounds_to_kill = _mean_or_nan(rounds[winners == 1])
+        self.second_rounds_to_kill = _mean_or_nan(rounds[winners == 2])
+
+    def __str__(self) -> str:
+        return (
+            f"{self.first} vs {self.second}: "
+            f"{self.first} wins {self.first_win_rate:.1%} "
+            f"(in {self.first_rounds_to_kill:.1f} rounds), "
+            f"{self.second} wins {self.second_win_rate:.1%} "
+            f"(in {self.second_rounds_to_kill:.1f} rounds), "
+            f"draws {self.draw_rate:.1%}"
+        )
+
+
+def _mean_or_nan(values: np.ndarray) -> float:
+    return float(values.mean()) if len(values) else float("nan")
+
+
+def simulate_duels(
+    first: Actor,
+    second: Actor,
+    generator: np.random.Generator,
+    duels: int = 10_000,
+    max_rounds: int = 100,
+) -> DuelResult:
+    """Fight `duels` melee duels to the death, `first` attacking first each round.
+
+    Only the duels which are still undecided are rolled each round.
+    """
+    attacker = CombatProfile(first)
+    defender = CombatProfile(second)
+    first_hp = attacker.roll_hp(generator, duels)
+    second_hp = defender.roll_hp(generator, duels)
+    # Fighter.hp never goes above max_hp, even when a negative damage roll heals.
+    first_max_hp = first_hp.copy()
+    second_max_hp = second_hp.copy()
+    winners = np.zeros(duels, dtype=np.int8)
+    rounds = np.zeros(duels, dtype=np.int32)
+
+    active = np.arange(duels)
+    for round_number in range(1, max_rounds + 1):
+        if not len(active):
+            break
+        rounds[active] = round_number
+
+        second_hp[active] = np.minimum(
+            second_hp[active] - attacker.attack(defender, generator, len(active)),
+            second_max_hp[active],
+        )
+        killed = second_hp[active] <= 0
+        winners[active[killed]] = 1
+        active = active[~killed]
+
+        first_hp[active] = np.minimum(
+            first_hp[active] - defender.attack(attacker, generator, len(active)),
+            first_max_hp[active],
+        )
+        killed = first_hp[active] <= 0
+        winners[active[killed]] = 2
+        active = active[~killed]
+
+    return DuelResult(first.name, second.name, winners, rounds)
+
+
+def simulate_matchups(
+    actors: List[Actor],
+    generator: np.random.Generator,
+    duels: int = 10_000,
+    max_rounds: int = 100,
+) -> Dict[Tuple[str, str], DuelResult]:
+    """Duel every actor against every other actor, keyed by (first, second) names."""
+    return {
+        (first.name, second.name): simulate_duels(
+            first, second, generator, duels=duels, max_rounds=max_rounds
+        )
+        for first in actors
+        for second in actors
+        if first is not second
+    }
@@ -2,7 +2,13 @@ from __future__ import annotations
 from components.base_component import BaseComponent
 
 
+# Changing any of these invalidates the parent's compiled Fighter.stats.
+SCORES = ("str", "dex", "con", "int", "wis", "cha")
+
+
 class Abilities(BaseComponent):
+    __slots__ = SCORES
+
     def __init__(
         self,
         strength: int = 10,
@@ -19,6 +25,11 @@ class Abilities(BaseComponent):
         self.wis = wisdom
         self.cha = charisma
 
+    def __setattr__(self, name: str, value: object) -> None:
+        super().__setattr__(name, value)
+        if name in SCORES and hasattr(self, "parent"):
+            self.parent.fighter.invalidate_stats()
+
     def get_modifier(self, score: int) -> int:
         """FTD Ability Score to Modifier conversion [cite: 315]"""
         if score >= 18: return 4
@@ -1,55 +1,56 @@
 from __future__ import annotations
 
-import random
-from typing import List, Optional, Tuple, TYPE_CHECKING
-
-import numpy as np  # type: ignore
-import tcod
+from collections import deque
+from itertools import islice
+from typing import Deque, List, Optional, Tuple, TYPE_CHECKING
 
 from actions import Action, BumpAction, MeleeAction, MovementAction, WaitAction
+from pathfinding import find_path, hierarchical_path
 
 if TYPE_CHECKING:
     from entity import Actor
 
+# Number of upcoming steps of a stored path which are checked before it is reused.
+PATH_CHECK_STEPS = 3
+# Paths to destinations further away than this use the room graph.
+HIERARCHICAL_PATH_DISTANCE = 24
+
 
 class BaseAI(Action):
+    __slots__ = ()
+
     def perform(self) -> None:
         raise NotImplementedError()
 
+    def is_idle(self) -> bool:
+        """Return True if this AI would only wait until something wakes it up."""
+        return False
+
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         """Compute and return a path to the target position.
 
         If there is no valid path then returns an empty list.
         """
-        # Copy the walkable array.
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype=np.int8)
-
-        for entity in self.entity.gamemap.entities:
-            # Check that an entity blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                cost[entity.x, entity.y] += 10
-
-        # Create a graph from the cost array and pass that graph to a new pathfinder.
-        graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
-        pathfinder = tcod.path.Pathfinder(graph)
-
-        pathfinder.add_root((self.entity.x, self.entity.y))  # Start position.
+        gamemap = self.entity.gamemap
+        start = (self.entity.x, self.entity.y)
 
-        # Compute the path to the destination and remove the starting point.
-        path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
+        # Long paths are planned over the room graph, searching only a couple of rooms
+        # at a time instead of the whole map.
+        if max(abs(dest_x - start[0]), abs(dest_y - start[1])) > HIERARCHICAL_PATH_DISTANCE:
+            path = hierarchical_path(gamemap, start, (dest_x, dest_y))
+            if path is not None:
+                return path
 
-        # Convert from List[List[int]] to List[Tuple[int, int]].
-        return [(index[0], index[1]) for index in path]
+        cost = gamemap.path_cost(0, 0, gamemap.width, gamemap.height)
+        return find_path(cost, (0, 0), start, (dest_x, dest_y)) or []
 
 
 class HostileEnemy(BaseAI):
+    __slots__ = ("path",)
+
     def __init__(self, entity: Actor):
         super().__init__(entity)
-        self.path: List[Tuple[int, int]] = []
+        self.path: Deque[Tuple[int, int]] = deque()
 
     def perform(self) -> None:
         target = self.engine.player
@@ -61,16 +62,58 @@ class HostileEnemy(BaseAI):
             if distance <= 1:
                 return MeleeAction(self.entity, dx, dy).perform()
 
-            self.path = self.get_path_to(target.x, target.y)
+            self.update_path(target.x, target.y, distance)
 
         if self.path:
-            dest_x, dest_y = self.path.pop(0)
+            dest_x, dest_y = self.path.popleft()
             return MovementAction(
                 self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
             ).perform()
 
         return WaitAction(self.entity).perform()
 
+    def is_idle(self) -> bool:
+        return not self.path and not self.engine.game_map.visible[self.entity.x, self.entity.y]
+
+    def update_path(self, target_x: int, target_y: int, distance: int) -> None:
+        """Make sure `self.path` leads to the target, reusing the current path if possible.
+
+        If the target only stepped off the end of the path it is extended by that step.
+        A new path is only found if the path is empty, has grown too long, or one of
+        its next few steps is blocked.
+        """
+        path = self.path
+        if path and path[-1] != (target_x, target_y):
+            end_x, end_y = path[-1]
+            if max(abs(target_x - end_x), abs(target_y - end_y)) <= 1:
+                path.append((target_x, target_y))  # Follow the target's last step.
+            else:
+                path.clear()
+
+        if path and len(path) <= distance * 2 and self.next_steps_are_clear(target_x, target_y):
+            return
+
+        # Walk down the flow field shared by every monster chasing the player,
+        # and only fall back to a search of our own if it doesn't reach us.
+        new_path = self.engine.get_flow_field().path_from(self.entity.x, self.entity.y)
+        if new_path is None:
+            new_path = self.get_path_to(target_x, target_y)
+        self.path = deque(new_path)
+
+    def next_steps_are_clear(self, target_x: int, target_y: int) -> bool:
+        """Return True if the next PATH_CHECK_STEPS steps of the path can be walked."""
+        gamemap = self.entity.gamemap
+        last_x, last_y = self.entity.x, self.entity.y
+        for x, y in islice(self.path, PATH_CHECK_STEPS):
+            if max(abs(x - last_x), abs(y - last_y)) != 1:
+                return False  # The path doesn't start next to us anymore.
+            if (x, y) == (target_x, target_y):
+                break
+            if not gamemap.is_walkable(x, y) or gamemap.get_blocking_entity_at_location(x, y):
+                return False
+            last_x, last_y = x, y
+        return True
+
 
 class ConfusedEnemy(BaseAI):
     """
@@ -78,6 +121,8 @@ class ConfusedEnemy(BaseAI):
     If an actor occupies a tile it is randomly moving into, it will attack.
     """
 
+    __slots__ = ("previous_ai", "turns_remaining")
+
     def __init__(
         self, entity: Actor, previous_ai: Optional[BaseAI], turns_remaining: int
     ):
@@ -95,7 +140,7 @@ class ConfusedEnemy(BaseAI):
             self.entity.ai = self.previous_ai
         else:
             # Pick a random direction
-            direction_x, direction_y = random.choice(
+            direction_x, direction_y = self.engine.rng.stream("ai").choice(
                 [
                     (-1, -1),  # Northwest
                     (0, -1),  # North
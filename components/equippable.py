@@ -1,15 +1,36 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import NamedTuple, TYPE_CHECKING
 
 from components.base_component import BaseComponent
 from equipment_types import EquipmentType
+from flyweight import intern, kind_field
 
 if TYPE_CHECKING:
     from entity import Item
 
 
+class EquippableKind(NamedTuple):
+    """The bonuses and damage dice shared by all items of the same kind."""
+
+    equipment_type: EquipmentType
+    power_bonus: int
+    defense_bonus: int
+    damage_dice_num: int
+    damage_dice_sides: int
+
+
 class Equippable(BaseComponent):
+    __slots__ = ("kind",)
+
+    kind: EquippableKind
+
+    equipment_type = kind_field("equipment_type")
+    power_bonus = kind_field("power_bonus")
+    defense_bonus = kind_field("defense_bonus")
+    damage_dice_num = kind_field("damage_dice_num")
+    damage_dice_sides = kind_field("damage_dice_sides")
+
     def __init__(
         self,
         equipment_type: EquipmentType,
@@ -18,28 +39,36 @@ class Equippable(BaseComponent):
         damage_dice_num: int = 1,   # Number of dice (e.g., 2 in 2d6)
         damage_dice_sides: int = 4, # Sides of dice (e.g., 6 in 1d6)
     ):
-        self.equipment_type = equipment_type
-        self.power_bonus = power_bonus
-        self.defense_bonus = defense_bonus
-        self.damage_dice_num = damage_dice_num
-        self.damage_dice_sides = damage_dice_sides
+        self.kind = intern(
+            EquippableKind(
+                equipment_type, power_bonus, defense_bonus, damage_dice_num, damage_dice_sides
+            )
+        )
 
 
 class Dagger(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, power_bonus=2)
 
 
 class Sword(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, power_bonus=4)
 
 
 class LeatherArmor(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.ARMOR, defense_bonus=1)
 
 
 class ChainMail(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.ARMOR, defense_bonus=3)
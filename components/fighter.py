@@ -1,30 +1,73 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import NamedTuple, Optional, Tuple, TYPE_CHECKING
 
 import color
 import dice
 import random
 from components.base_component import BaseComponent
+from flyweight import intern
 from render_order import RenderOrder
 
 if TYPE_CHECKING:
-    from entity import Actor
+    from entity import Actor, EntityKind
+
+
+def corpse_kind(kind: EntityKind) -> EntityKind:
+    """Return the kind of the remains of an actor, shared by all remains of its kind."""
+    return intern(
+        kind._replace(
+            char=chr(894),
+            color=(191, 0, 0),
+            name=f"remains of {kind.name}",
+            blocks_movement=False,
+            render_order=RenderOrder.CORPSE,
+        )
+    )
+
+
+class StatBlock(NamedTuple):
+    """Combat stats derived from an actor's abilities, equipment and level."""
+
+    attack_bonus: int  # Added to the d20 attack roll.
+    armor_class: int
+    power_bonus: int  # From all equipped items.
+    damage_number: int  # Damage is damage_number d damage_sides + damage_bonus.
+    damage_sides: int
+    damage_bonus: int
+
+    @property
+    def min_damage(self) -> int:
+        return self.damage_number + self.damage_bonus
+
+    @property
+    def max_damage(self) -> int:
+        return self.damage_number * self.damage_sides + self.damage_bonus
 
 
 class Fighter(BaseComponent):
+    __slots__ = ("hit_dice", "max_hp", "_hp", "armor_value", "base_damage_die", "_stats")
+
     parent: Actor
 
     def __init__(self, hit_dice: int = 0, hp: int = 0, armor_value: int = 0, base_damage_die: int = 1):
         self.hit_dice = hit_dice
         # If hit_dice is provided, roll 1d8 per HD as per FTD [cite: 1091]
+        # Templates use the average until roll_hit_points is called on a copy.
         if hit_dice > 0:
-            self.max_hp = dice.roll(hit_dice, 8)
+            self.max_hp = int(dice.expected_value(hit_dice, 8))
         else:
             self.max_hp = hp
         self._hp = self.max_hp
         self.armor_value = armor_value
         self.base_damage_die = base_damage_die
+        self._stats: Optional[StatBlock] = None
+
+    def roll_hit_points(self, rng: random.Random) -> None:
+        """Roll max_hp from the hit dice and heal to full, if this fighter has hit dice."""
+        if self.hit_dice > 0:
+            self.max_hp = dice.roll(self.hit_dice, 8, rng)
+            self.hp = self.max_hp
 
     @property
     def hp(self) -> int:
@@ -33,74 +76,81 @@ class Fighter(BaseComponent):
     @hp.setter
     def hp(self, value: int) -> None:
         self._hp = max(0, min(value, self.max_hp))
+        self.parent.sync_store()
         if self._hp == 0 and self.parent.ai:
             self.die()
 
     @property
     def power(self) -> int:
         """Calculates the final damage result for an attack."""
+        stats = self.stats
+        rng = self.engine.rng.stream("combat")
+        return dice.roll(stats.damage_number, stats.damage_sides, rng) + stats.damage_bonus
+
+    @property
+    def stats(self) -> StatBlock:
+        """The derived combat stats, compiled on first use after invalidate_stats."""
+        if self._stats is None:
+            self._stats = self.compile_stats()
+        return self._stats
+
+    def invalidate_stats(self) -> None:
+        """Recompile the stats on next use.  Call after anything they depend on changes."""
+        self._stats = None
+        self.parent.sync_store()
+
+    def compile_stats(self) -> StatBlock:
+        """Compute the combat stats from the abilities, equipment and level of the parent."""
         str_mod = self.parent.abilities.str_mod
         weapon = getattr(self.parent.equipment, "weapon", None)
 
         if weapon and weapon.equippable:
-            roll = sum(
-                random.randint(1, weapon.equippable.damage_dice_sides)
-                for _ in range(weapon.equippable.damage_dice_num)
-            )
-            return roll + str_mod + weapon.equippable.power_bonus
+            damage_number = weapon.equippable.damage_dice_num
+            damage_sides = weapon.equippable.damage_dice_sides
+            damage_bonus = str_mod + weapon.equippable.power_bonus
+        else:
+            # Use the renamed variable here for natural attacks
+            damage_number, damage_sides, damage_bonus = 1, max(1, self.base_damage_die), str_mod
+
+        # FTD AC: base 10, plus the Dexterity Modifier, the dynamic bonus from currently
+        # equipped gear, and "Natural Armor" for monsters with thick skin.
+        armor_class = (
+            10
+            + self.parent.abilities.dex_mod
+            + self.parent.equipment.defense_bonus
+            + self.armor_value
+        )
+
+        return StatBlock(
+            attack_bonus=str_mod,
+            armor_class=armor_class,
+            power_bonus=self.parent.equipment.power_bonus if self.parent.equipment else 0,
+            damage_number=damage_number,
+            damage_sides=damage_sides,
+            damage_bonus=damage_bonus,
+        )
 
-        # Use the renamed variable here for natural attacks
-        return random.randint(1, max(1, self.base_damage_die)) + str_mod
+    @property
+    def damage_dice(self) -> Tuple[int, int, int]:
+        """Return the (number, sides, bonus) of the NdS+bonus damage roll of an attack."""
+        stats = self.stats
+        return stats.damage_number, stats.damage_sides, stats.damage_bonus
 
     @property
     def armor_class(self) -> int:
-        # 1. Base FTD starts at 10
-        base_ac = 10
-
-        # 2. Add the Dexterity Modifier from abilities.py
-        dex_mod = self.parent.abilities.dex_mod
-
-        # 3. Get the dynamic bonus from currently equipped gear
-        # This calls the Equipment component to see what's in the 'slots'
-        equipment_bonus = self.parent.equipment.defense_bonus
-
-        # 4. Add "Natural Armor" (base_defense)
-        # This is for monsters who have thick skin but don't wear clothes
-        natural_armor = self.armor_value
-
-        return base_ac + dex_mod + equipment_bonus + natural_armor
+        return self.stats.armor_class
 
     @property
     def power_bonus(self) -> int:
-        if self.parent.equipment:
-            return self.parent.equipment.power_bonus
-        else:
-            return 0
+        return self.stats.power_bonus
 
     @property
     def min_damage(self) -> int:
-        str_mod = self.parent.abilities.str_mod
-        weapon = getattr(self.parent.equipment, "weapon", None)
-
-        if weapon and weapon.equippable:
-            # Minimum roll is 1 per die
-            return weapon.equippable.damage_dice_num + str_mod + weapon.equippable.power_bonus
-
-        # Unarmed min is 1 + str_mod
-        return 1 + str_mod
+        return self.stats.min_damage
 
     @property
     def max_damage(self) -> int:
-        str_mod = self.parent.abilities.str_mod
-        weapon = getattr(self.parent.equipment, "weapon", None)
-
-        if weapon and weapon.equippable:
-            # Maximum roll is sides * num_dice
-            max_roll = weapon.equippable.damage_dice_num * weapon.equippable.damage_dice_sides
-            return max_roll + str_mod + weapon.equippable.power_bonus
-
-        # Unarmed max is base_damage_die + str_mod
-        return self.base_damage_die + str_mod
+        return self.stats.max_damage
 
     def die(self) -> None:
         if self.engine.player is self.parent:
@@ -110,12 +160,9 @@ class Fighter(BaseComponent):
             death_message = f"{self.parent.name} is dead!"
             death_message_color = color.enemy_die
 
-        self.parent.char = chr(894)
-        self.parent.color = (191, 0, 0)
-        self.parent.blocks_movement = False
+        self.parent.kind = corpse_kind(self.parent.kind)
         self.parent.ai = None
-        self.parent.name = f"remains of {self.parent.name}"
-        self.parent.render_order = RenderOrder.CORPSE
+        self.gamemap.on_actor_died(self.parent)
 
         self.engine.message_log.add_message(death_message, death_message_color)
 
@@ -9,6 +9,14 @@ if TYPE_CHECKING:
 
 
 class Level(BaseComponent):
+    __slots__ = (
+        "current_level",
+        "current_xp",
+        "level_up_base",
+        "level_up_factor",
+        "xp_given",
+    )
+
     parent: Actor
 
     def __init__(
@@ -59,10 +67,12 @@ class Level(BaseComponent):
 
     def increase_power(self, amount: int = 1) -> None:
         self.parent.fighter.base_damage_die += amount
+        self.parent.fighter.invalidate_stats()
         self.engine.message_log.add_message("You feel stronger!")
         self.increase_level()
 
     def increase_defense(self, amount: int = 1) -> None:
         self.parent.fighter.armor_value += amount
+        self.parent.fighter.invalidate_stats()
         self.engine.message_log.add_message("Your movements are getting swifter!")
         self.increase_level()
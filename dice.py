@@ -1,27 +1,81 @@
+from functools import lru_cache
 import random
-from typing import Tuple
+from typing import Tuple, Union
 
+import numpy as np  # type: ignore
 
-def roll(number: int, sides: int) -> int:
+IntOrArray = Union[int, np.ndarray]
+
+
+def roll(number: int, sides: int, rng: random.Random) -> int:
     """Rolls a specified number of dice with a certain number of sides (e.g., 3d6)."""
-    return sum(random.randint(1, sides) for _ in range(number))
+    return sum(rng.randint(1, sides) for _ in range(number))
 
 
-def d20() -> int:
+def d20(rng: random.Random) -> int:
     """Standard d20 roll for checks."""
-    return random.randint(1, 20)
+    return rng.randint(1, 20)
 
 
-def d20_advantage() -> int:
+def d20_advantage(rng: random.Random) -> int:
     """Roll 2d20 and take the better result[cite: 230]."""
-    return max(random.randint(1, 20), random.randint(1, 20))
+    return max(rng.randint(1, 20), rng.randint(1, 20))
 
 
-def d20_disadvantage() -> int:
+def d20_disadvantage(rng: random.Random) -> int:
     """Roll 2d20 and take the lesser result[cite: 231]."""
-    return min(random.randint(1, 20), random.randint(1, 20))
+    return min(rng.randint(1, 20), rng.randint(1, 20))
 
 
-def ftd_attribute() -> int:
+def ftd_attribute(rng: random.Random) -> int:
     """Standard 3d6 for human attributes[cite: 298]."""
-    return roll(3, 6)
\ No newline at end of file
+    return roll(3, 6, rng)
+
+
+def roll_batch(
+    number: IntOrArray,
+    sides: IntOrArray,
+    generator: np.random.Generator,
+    count: int = 1,
+    modifier: IntOrArray = 0,
+) -> np.ndarray:
+    """Roll many NdS+modifier expressions at once and return their totals.
+
+    `number`, `sides` and `modifier` are either ints, for `count` rolls of the same
+    expression, or equal length arrays, for one roll of each of those expressions.
+    """
+    number = np.asarray(number, dtype=np.int64)
+    sides = np.asarray(sides, dtype=np.int64)
+    modifier = np.asarray(modifier, dtype=np.int64)
+    if number.ndim == 0 and sides.ndim == 0:
+        dice = generator.integers(1, int(sides) + 1, size=(count, int(number)))
+        return dice.sum(axis=1) + modifier
+
+    number, sides, modifier = np.broadcast_arrays(number, sides, modifier)
+    most_dice = int(number.max(initial=0))
+    dice = generator.integers(1, sides[:, np.newaxis] + 1, size=(len(number), most_dice))
+    # Expressions with fewer dice only count their first `number` columns.
+    dice[np.arange(most_dice) >= number[:, np.newaxis]] = 0
+    return dice.sum(axis=1) + modifier
+
+
+@lru_cache(maxsize=None)
+def distribution(number: int, sides: int, modifier: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the possible totals of NdS+modifier and the probability of each.
+
+    The probabilities come from repeated convolution of a single die, so they are
+    exact up to floating point rounding.  Results are cached and read-only.
+    """
+    probabilities = np.ones(1)
+    die = np.full(sides, 1 / sides)
+    for _ in range(number):
+        probabilities = np.convolve(probabilities, die)
+    totals = np.arange(number, number * sides + 1) + modifier
+    totals.flags.writeable = False
+    probabilities.flags.writeable = False
+    return totals, probabilities
+
+
+def expected_value(number: int, sides: int, modifier: int = 0) -> float:
+    """Return the average total of NdS+modifier."""
+    return number * (sides + 1) / 2 + modifier
@@ -2,46 +2,143 @@ from __future__ import annotations
 
 import lzma
 import pickle
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from tcod.console import Console
 from tcod.map import compute_fov
 
 import exceptions
 from message_log import MessageLog
+from pathfinding import FlowField
 import render_functions
+from rng import RandomStreams
+from scheduler import action_delay
 
 if TYPE_CHECKING:
     from entity import Actor
     from game_map import GameMap, GameWorld
 
 
+FOV_RADIUS = 8
+FOV_CACHE_SIZE = 32  # Number of recent FOV windows kept per map.
+# Monsters chasing the player path over a window this far around them.
+FLOW_FIELD_RADIUS = FOV_RADIUS * 3
+# Sleeping monsters this close to the player wake up even without seeing them.
+WAKE_RADIUS = 3
+# Every save file starts with this.  Change the version whenever saved objects change
+# in a way older saves can't be loaded into.
+SAVE_HEADER = b"yarl-save 1\n"
+
+
 class Engine:
     game_map: GameMap
     game_world: GameWorld
 
-    def __init__(self, player: Actor):
+    def __init__(self, player: Actor, seed: Optional[int] = None):
+        self.rng = RandomStreams(seed)  # Every random roll in the game comes from here.
         self.message_log = MessageLog()
         self.mouse_location = (0, 0)
         self.player = player
+        self.flow_field: Optional[FlowField] = None
 
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
-            if entity.ai:
-                try:
-                    entity.ai.perform()
-                except exceptions.Impossible:
-                    pass  # Ignore impossible action exceptions from AI.
+        """Let every awake monster act until the player is due to act again.
+
+        Monsters are popped from the map's scheduler in the order of their next action,
+        so faster monsters get several actions per player turn and slower ones skip some.
+        Monsters sleep until they are visible, close to the player, or hear a fight, and
+        go back to sleep once their AI is idle, so only the monsters near the player
+        cost anything each turn.
+        """
+        game_map = self.game_map
+        scheduler = game_map.scheduler
+        until = scheduler.time + action_delay(self.player)
+        self.wake_monsters()
+        self.flow_field = None  # Recomputed at most once per turn, on first use.
+        while True:
+            entity = scheduler.pop(until)
+            if entity is None:
+                break
+            try:
+                entity.ai.perform()
+            except exceptions.Impossible:
+                pass  # Ignore impossible action exceptions from AI.
+            if entity not in scheduler:
+                continue  # It died or left the map.
+            if entity.ai and not entity.ai.is_idle():
+                scheduler.schedule(entity, scheduler.time + action_delay(entity))
+            else:
+                game_map.sleep(entity)
+        scheduler.time = until
+        self.flow_field = None
+
+    def wake_monsters(self) -> None:
+        """Wake the monsters which the player can see or which are next to the player."""
+        game_map = self.game_map
+        game_map.wake_within(self.player.x, self.player.y, WAKE_RADIUS)
+        if game_map.visible_window is not None:
+            for actor in game_map.actor_store.actors_in_rect(*game_map.visible_window):
+                if game_map.visible[actor.x, actor.y]:
+                    game_map.wake(actor)
+
+    def get_flow_field(self) -> FlowField:
+        """Return this turn's flow field toward the player, computing it if needed.
+
+        It covers the FLOW_FIELD_RADIUS window around the player, which contains every
+        monster that can see the player.
+        """
+        if self.flow_field is None:
+            game_map = self.game_map
+            x, y = self.player.x, self.player.y
+            x1, y1 = max(0, x - FLOW_FIELD_RADIUS), max(0, y - FLOW_FIELD_RADIUS)
+            x2 = min(game_map.width, x + FLOW_FIELD_RADIUS + 1)
+            y2 = min(game_map.height, y + FLOW_FIELD_RADIUS + 1)
+            self.flow_field = FlowField(
+                game_map.path_cost(x1, y1, x2, y2), origin=(x1, y1), target=(x, y)
+            )
+        return self.flow_field
 
     def update_fov(self) -> None:
-        """Recompute the visible area based on the players point of view."""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
-            (self.player.x, self.player.y),
-            radius=8,
-        )
-        # If a tile is "visible" it should be added to "explored".
-        self.game_map.explored |= self.game_map.visible
+        """Recompute the visible area based on the players point of view.
+
+        Only the square window which the FOV radius can reach around the player is
+        computed, so the cost of this does not depend on the size of the map.  Results
+        are cached per map by player position and transparency version, so waiting or
+        walking back over recent tiles reuses earlier windows.
+        """
+        game_map = self.game_map
+        x, y = self.player.x, self.player.y
+        key = (x, y, FOV_RADIUS, game_map.transparency_version)
+        if key == game_map.fov_key:
+            return  # Nothing which affects the FOV changed since the last update.
+
+        x1, y1 = max(0, x - FOV_RADIUS), max(0, y - FOV_RADIUS)
+        x2 = min(game_map.width, x + FOV_RADIUS + 1)
+        y2 = min(game_map.height, y + FOV_RADIUS + 1)
+
+        window = game_map.fov_cache.get(key)
+        if window is not None:
+            game_map.fov_cache.move_to_end(key)
+        else:
+            window = compute_fov(
+                game_map.tile_window("transparent", x1, y1, x2, y2),
+                (x - x1, y - y1),
+                radius=FOV_RADIUS,
+            )
+            game_map.fov_cache[key] = window
+            if len(game_map.fov_cache) > FOV_CACHE_SIZE:
+                game_map.fov_cache.popitem(last=False)
+            # If a tile is "visible" it should be added to "explored".
+            # Cached windows were already merged when they were first computed.
+            game_map.explored.merge_window(x1, y1, window)
+
+        # Everything outside of the last window is already not visible.
+        if game_map.visible_window is not None:
+            old_x1, old_y1, old_x2, old_y2 = game_map.visible_window
+            game_map.visible[old_x1:old_x2, old_y1:old_y2] = False
+        game_map.visible[x1:x2, y1:y2] = window
+        game_map.visible_window = (x1, y1, x2, y2)
+        game_map.fov_key = key
 
     def render(self, console: Console) -> None:
         self.game_map.render(console)
@@ -71,7 +168,7 @@ class Engine:
 
     def save_as(self, filename: str) -> None:
         """Save this Engine instance as a compressed file."""
-        save_data = lzma.compress(pickle.dumps(self))
+        save_data = lzma.compress(SAVE_HEADER + pickle.dumps(self))
         with open(filename, "wb") as f:
             f.write(save_data)
 
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import copy
 import math
-from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
+from typing import NamedTuple, Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
 
+from flyweight import intern, kind_field
+from prototype import compile_prototype
 from render_order import RenderOrder
+from scheduler import NORMAL_SPEED
+from slotted import Slotted
 
 if TYPE_CHECKING:
     from components.ai import BaseAI
@@ -21,12 +24,32 @@ if TYPE_CHECKING:
 T = TypeVar("T", bound="Entity")
 
 
-class Entity:
+class EntityKind(NamedTuple):
+    """The look of an entity, shared by all entities of the same kind."""
+
+    char: str
+    color: Tuple[int, int, int]
+    name: str
+    blocks_movement: bool
+    render_order: RenderOrder
+
+
+class Entity(Slotted):
     """
     A generic object to represent players, enemies, items, etc.
     """
 
+    # Weak references are used by the prototype cache of templates.
+    __slots__ = ("x", "y", "kind", "parent", "__weakref__")
+
     parent: Union[GameMap, Inventory]
+    kind: EntityKind
+
+    char = kind_field("char")
+    color = kind_field("color")
+    name = kind_field("name")
+    blocks_movement = kind_field("blocks_movement")
+    render_order = kind_field("render_order")
 
     def __init__(
         self,
@@ -41,39 +64,49 @@ class Entity:
     ):
         self.x = x
         self.y = y
-        self.char = char
-        self.color = color
-        self.name = name
-        self.blocks_movement = blocks_movement
-        self.render_order = render_order
+        self.kind = intern(EntityKind(char, color, name, blocks_movement, render_order))
         if parent:
             # If parent isn't provided now then it will be set later.
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     @property
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
 
+    def instantiate(self: T) -> T:
+        """Return a new copy of this template, built from its compiled prototype."""
+        return compile_prototype(self).build()  # type: ignore
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int) -> T:
         """Spawn a copy of this instance at the given location."""
-        clone = copy.deepcopy(self)
+        clone = self.instantiate()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
 
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         """Place this entity at a new location.  Handles moving across GameMaps."""
+        on_map = hasattr(self, "parent") and self.parent is self.gamemap  # Possibly uninitialized.
+        if not gamemap:
+            if on_map:
+                self.gamemap.move_entity(self, x, y)
+            else:
+                self.x = x
+                self.y = y
+            return
+
+        if on_map:
+            self.gamemap.remove_entity(self)
+        if self in gamemap.entities:
+            # Already listed on the destination map, but indexed at its old location.
+            gamemap.remove_entity(self)
         self.x = x
         self.y = y
-        if gamemap:
-            if hasattr(self, "parent"):  # Possibly uninitialized.
-                if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
-            self.parent = gamemap
-            gamemap.entities.add(self)
+        self.parent = gamemap
+        gamemap.add_entity(self)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -83,11 +116,12 @@ class Entity:
 
     def move(self, dx: int, dy: int) -> None:
         # Move the entity by a given amount
-        self.x += dx
-        self.y += dy
+        self.place(self.x + dx, self.y + dy)
 
 
 class Actor(Entity):
+    __slots__ = ("ai", "speed", "equipment", "fighter", "inventory", "level", "abilities")
+
     def __init__(
         self,
         *,
@@ -103,6 +137,7 @@ class Actor(Entity):
         inventory: Inventory,
         level: Level,
         render_order: RenderOrder = RenderOrder.ACTOR,  # Added for custom priority
+        speed: int = NORMAL_SPEED,
     ):
         super().__init__(
             x=x,
@@ -115,6 +150,9 @@ class Actor(Entity):
         )
 
         self.ai: Optional[BaseAI] = ai_cls(self)
+        # Relative action rate, see scheduler.NORMAL_SPEED.  Haste and slow effects
+        # change this, it takes effect from the actor's next action.
+        self.speed = speed
 
         self.equipment: Equipment = equipment
         self.equipment.parent = self
@@ -131,13 +169,29 @@ class Actor(Entity):
         self.abilities = abilities
         self.abilities.parent = self
 
+    def spawn(self, gamemap: GameMap, x: int, y: int) -> Actor:
+        """Spawn a copy of this actor, rolling its hit points from the spawn stream."""
+        clone = super().spawn(gamemap, x, y)
+        clone.fighter.roll_hit_points(gamemap.engine.rng.stream("spawn"))
+        return clone
+
     @property
     def is_alive(self) -> bool:
         """Returns True as long as this actor can perform actions."""
         return bool(self.ai)
 
+    def sync_store(self) -> None:
+        """Write this actor's position and combat stats through to its map's ActorStore."""
+        if not hasattr(self, "parent"):  # Not placed on a map yet.
+            return
+        actor_store = self.parent.actor_store
+        if self in actor_store:
+            actor_store.update(self)
+
 
 class Item(Entity):
+    __slots__ = ("consumable", "equippable")
+
     def __init__(
         self,
         *,
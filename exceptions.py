@@ -5,5 +5,9 @@ class Impossible(Exception):
     """
 
 
+class IncompatibleSave(Exception):
+    """Exception raised when a save file was written by another version of the game."""
+
+
 class QuitWithoutSaving(SystemExit):
     """Can be raised to exit the game without automatically saving."""
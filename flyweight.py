@@ -0,0 +1,33 @@
+"""Flyweights: constant data shared by every entity or component of one kind.
+
+A kind is an immutable NamedTuple, for example the look and name of all orcs.  Each
+instance keeps a single reference to its kind instead of its own copy of every field,
+and kind_field properties read the fields through that reference.  Kinds are interned,
+so instances which look alike share one kind, in memory and in save files.
+"""
+from __future__ import annotations
+
+import operator
+from typing import Any, Dict, Tuple, TypeVar
+
+K = TypeVar("K", bound=Tuple[Any, ...])
+
+_interned: Dict[Tuple[type, Tuple[Any, ...]], Any] = {}
+
+
+def intern(kind: K) -> K:
+    """Return the shared kind equal to `kind`."""
+    return _interned.setdefault((type(kind), kind), kind)
+
+
+def kind_field(name: str) -> property:
+    """Return a property for the field `name` of an instance's kind.
+
+    Setting it moves only that instance to an interned copy of its kind with the field
+    changed, other instances of the old kind are not affected.
+    """
+
+    def set_field(self: Any, value: Any) -> None:
+        self.kind = intern(self.kind._replace(**{name: value}))
+
+    return property(operator.attrgetter(f"kind.{name}"), set_field)
@@ -1,70 +1,343 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
 
 import numpy as np  # type: ignore
 from tcod.console import Console
 
+from actor_store import ActorStore
+from bit_packed_array import BitPackedArray
+from chunked_array import ChunkedArray
 from entity import Actor, Item
+from pathfinding import RoomGraph
+from scheduler import TurnScheduler, action_delay
 import tile_types
 
 if TYPE_CHECKING:
     from engine import Engine
-    from entity import Entity
+    from entity import Entity, EntityKind
+
+
+# Maps with more tiles than this use the lazily allocated ChunkedArray backend.
+CHUNKED_MAP_THRESHOLD = 1024 * 1024
+
+# Added to the pathfinding cost of a tile occupied by a blocking entity.
+# A lower number means more enemies will crowd behind each other in
+# hallways.  A higher number means enemies will take longer paths in
+# order to surround the player.
+ENTITY_CROWDING_COST = 10
 
 
 class GameMap:
     def __init__(
-        self, engine: Engine, width: int, height: int, entities: Iterable[Entity] = ()
+        self,
+        engine: Engine,
+        width: int,
+        height: int,
+        entities: Iterable[Entity] = (),
+        chunked: Optional[bool] = None,
+        compact_corpses: bool = False,
     ):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
-        self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
-
-        self.visible = np.full(
-            (width, height), fill_value=False, order="F"
-        )  # Tiles the player can currently see
-        self.explored = np.full(
-            (width, height), fill_value=False, order="F"
-        )  # Tiles the player has seen before
+        self.entities: Set[Entity] = set()
+        # Spatial hash of every entity on this map, keyed by (x, y).
+        self.entities_by_location: Dict[Tuple[int, int], List[Entity]] = {}
+        # Membership views, kept as insertion-ordered dicts so iteration is stable.
+        self.living_actors: Dict[Actor, None] = {}
+        self.corpses: Dict[Actor, None] = {}
+        self.floor_items: Dict[Item, None] = {}
+        # The living actors whose AI takes turns, by the time of their next action.
+        # Everything else sleeps until something wakes it.
+        self.scheduler = TurnScheduler()
+        # Array-backed positions and combat stats, for vectorized queries over actors.
+        self.actor_store = ActorStore()
+
+        if chunked is None:
+            chunked = width * height > CHUNKED_MAP_THRESHOLD
+        self.chunked = chunked
+
+        # Tile ids indexing into tile_types.tile_table.  Write through set_tiles so the
+        # derived walkable/transparent/light/dark views are invalidated.
+        if chunked:
+            # Untouched chunks share a single "all wall" sentinel.
+            self.tiles: Any = ChunkedArray((width, height), np.uint8, tile_types.WALL)
+        else:
+            self.tiles = np.full(
+                (width, height), fill_value=tile_types.WALL, dtype=np.uint8, order="F"
+            )
+
+        # Fog of war layers, stored at one bit per tile.
+        self.visible = BitPackedArray((width, height))  # Tiles the player can currently see
+        self.explored = BitPackedArray((width, height))  # Tiles the player has seen before
+        # The (x1, y1, x2, y2) window which was last written to `visible`.
+        self.visible_window: Optional[Tuple[int, int, int, int]] = None
+        # Key of the FOV currently in `visible`, and recent FOV windows by key.
+        self.fov_key: Optional[Tuple[int, int, int, int]] = None
+        self.fov_cache: OrderedDict[Tuple[int, int, int, int], np.ndarray] = OrderedDict()
+
+        # If True, monsters which die are removed from the entities and left as a
+        # decoration on their tile instead, so long fights don't slow down every scan
+        # over the entities.  Only the latest decoration of a tile is kept.
+        self.compact_corpses = compact_corpses
+        # Per tile, 1 + an index into decoration_kinds, or 0 for no decoration.
+        if chunked:
+            self.decorations: Any = ChunkedArray((width, height), np.uint16, 0)
+        else:
+            self.decorations = np.zeros((width, height), dtype=np.uint16, order="F")
+        self.decoration_kinds: List[EntityKind] = []
+        self._decoration_ids: Dict[EntityKind, int] = {}
 
         self.downstairs_location = (0, 0)
+        # Rooms and corridors from procgen, used for long distance path queries.
+        self.room_graph: Optional[RoomGraph] = None
+
+        self.tiles_version = 0  # Incremented whenever a tile changes.
+        self.transparency_version = 0  # Incremented whenever a tile's transparency changes.
+        self._tile_views: Dict[str, np.ndarray] = {}
+        self._tile_views_version = 0
+        self._cost_grid: Optional[np.ndarray] = None
+        self._cost_grid_version = 0
+
+        for entity in entities:
+            self.add_entity(entity)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Derived data, rebuilt on demand after loading.
+        state["_tile_views"] = {}
+        state["fov_cache"] = OrderedDict()
+        state["_cost_grid"] = None
+        return state
 
     @property
     def gamemap(self) -> GameMap:
         return self
 
+    def set_tiles(self, index: Any, tile_id: int) -> None:
+        """Set the tile id at an index (a location or a slice) of this map."""
+        if isinstance(index, tuple) and not isinstance(index[0], slice):
+            # A single location, procgen sets many of these.
+            transparent = tile_types.transparent_table
+            if transparent[int(self.tiles[index])] != transparent[tile_id]:
+                self.transparency_version += 1
+        else:
+            transparent = tile_types.tile_table["transparent"]
+            if (transparent[self.tiles[index]] != transparent[tile_id]).any():
+                self.transparency_version += 1
+        self.tiles[index] = tile_id
+        self.tiles_version += 1
+
+    def _tile_view(self, field: str) -> np.ndarray:
+        """Return a tile_dt field for the whole map, cached until the tiles change.
+
+        The view is dense even on chunked maps, use tile_window or is_walkable for parts
+        of the map.
+        """
+        if self._tile_views_version != self.tiles_version:
+            self._tile_views.clear()
+            self._tile_views_version = self.tiles_version
+        view = self._tile_views.get(field)
+        if view is None:
+            view = self._tile_views[field] = tile_types.tile_table[field][self.tiles[:, :]]
+        return view
+
+    def tile_window(self, field: str, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """Return a tile_dt field for the window [x1:x2, y1:y2] of this map."""
+        return tile_types.tile_table[field][self.tiles[x1:x2, y1:y2]]
+
+    @property
+    def cost_grid(self) -> np.ndarray:
+        """The pathfinding cost of every tile on this map.
+
+        Walls cost 0 (blocked), floors cost 1, and tiles with a blocking entity on them
+        cost ENTITY_CROWDING_COST more.  The walkable part is rebuilt only when the tiles
+        change, the entity overlay is kept up to date as entities move.
+
+        This is a dense array of the whole map, chunked maps use path_cost windows
+        instead.
+        """
+        if self._cost_grid is None or self._cost_grid_version != self.tiles_version:
+            cost = self.walkable.astype(np.int8)
+            # Living actors are the only entities which block movement.
+            xs, ys = self.actor_store.living_positions()
+            crowded = cost[xs, ys] > 0
+            cost[xs[crowded], ys[crowded]] += ENTITY_CROWDING_COST
+            self._cost_grid = cost
+            self._cost_grid_version = self.tiles_version
+        return self._cost_grid
+
+    def _update_cost_at(self, x: int, y: int) -> None:
+        """Refresh the entity overlay of the cost grid at one tile, if the grid exists."""
+        if self._cost_grid is None or self._cost_grid_version != self.tiles_version:
+            return  # Will be rebuilt from scratch on next use.
+        if self._cost_grid[x, y]:
+            crowded = self.get_blocking_entity_at_location(x, y) is not None
+            self._cost_grid[x, y] = 1 + (ENTITY_CROWDING_COST if crowded else 0)
+
+    def path_cost(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """Return the cost grid for the window [x1:x2, y1:y2] of this map.
+
+        On dense maps this is a view into the cached grid, it must not be modified.
+        Chunked maps build the window from their chunks on each call instead, like
+        tile_window, so their cost never needs an array the size of the whole map.
+        """
+        if not self.chunked:
+            return self.cost_grid[x1:x2, y1:y2]
+        cost = self.tile_window("walkable", x1, y1, x2, y2).astype(np.int8)
+        for actor in self.actor_store.actors_in_rect(x1, y1, x2, y2):
+            if cost[actor.x - x1, actor.y - y1]:
+                cost[actor.x - x1, actor.y - y1] += ENTITY_CROWDING_COST
+        return cost
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """Return True if the tile at (x, y) can be walked over.
+
+        This reads one tile, unlike `walkable` which builds a view of the whole map.
+        """
+        return tile_types.walkable_table[int(self.tiles[x, y])]
+
+    @property
+    def walkable(self) -> np.ndarray:
+        return self._tile_view("walkable")
+
+    @property
+    def transparent(self) -> np.ndarray:
+        return self._tile_view("transparent")
+
+    @property
+    def light(self) -> np.ndarray:
+        return self._tile_view("light")
+
+    @property
+    def dark(self) -> np.ndarray:
+        return self._tile_view("dark")
+
     @property
     def actors(self) -> Iterator[Actor]:
         """Iterate over this maps living actors."""
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+        # Iterate over a snapshot, actors may die while this is being consumed.
+        yield from tuple(self.living_actors)
 
     @property
     def items(self) -> Iterator[Item]:
-        yield from (entity for entity in self.entities if isinstance(entity, Item))
+        yield from tuple(self.floor_items)
+
+    def add_entity(self, entity: Entity) -> None:
+        """Add an entity to this map and index it at its current location."""
+        if entity in self.entities:
+            return
+        self.entities.add(entity)
+        self.entities_by_location.setdefault((entity.x, entity.y), []).append(entity)
+
+        if isinstance(entity, Actor):
+            self.actor_store.add(entity)
+            if entity.is_alive:
+                self.living_actors[entity] = None
+            else:
+                self.corpses[entity] = None
+        elif isinstance(entity, Item):
+            self.floor_items[entity] = None
+
+        if entity.blocks_movement:
+            self._update_cost_at(entity.x, entity.y)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Remove an entity from this map and from the spatial index."""
+        self.entities.remove(entity)
+        self._unindex(entity)
+
+        if isinstance(entity, Actor):
+            self.actor_store.remove(entity)
+            self.scheduler.unschedule(entity)
+        self.living_actors.pop(entity, None)  # type: ignore
+        self.corpses.pop(entity, None)  # type: ignore
+        self.floor_items.pop(entity, None)  # type: ignore
+
+        if entity.blocks_movement:
+            self._update_cost_at(entity.x, entity.y)
+
+    def on_actor_died(self, actor: Actor) -> None:
+        """Move an actor which just died from the living actors to the corpses."""
+        if actor in self.living_actors:
+            del self.living_actors[actor]
+            self.scheduler.unschedule(actor)
+            self.corpses[actor] = None
+            self.actor_store.set_alive(actor, False)
+            self._update_cost_at(actor.x, actor.y)
+            if self.compact_corpses and actor is not self.engine.player:
+                self.remove_entity(actor)
+                self.add_decoration(actor.x, actor.y, actor.kind)
+
+    def add_decoration(self, x: int, y: int, kind: EntityKind) -> None:
+        """Draw an entity kind on a tile as a decoration, replacing any earlier one."""
+        decoration_id = self._decoration_ids.get(kind)
+        if decoration_id is None:
+            self.decoration_kinds.append(kind)
+            decoration_id = self._decoration_ids[kind] = len(self.decoration_kinds)
+        self.decorations[x, y] = decoration_id
+
+    def get_decoration_at_location(self, x: int, y: int) -> Optional[EntityKind]:
+        decoration_id = int(self.decorations[x, y])
+        return self.decoration_kinds[decoration_id - 1] if decoration_id else None
+
+    def wake(self, actor: Actor) -> None:
+        """Schedule a turn for a sleeping monster, one action from now."""
+        if (
+            actor.ai
+            and actor not in self.scheduler
+            and actor in self.living_actors
+            and actor is not self.engine.player
+        ):
+            self.scheduler.schedule(actor, self.scheduler.time + action_delay(actor))
+
+    def wake_within(self, x: int, y: int, radius: float) -> None:
+        """Wake every actor within radius of (x, y)."""
+        for actor in self.actor_store.actors_within(x, y, radius):
+            self.wake(actor)
+
+    def sleep(self, actor: Actor) -> None:
+        """Stop giving an actor turns until it is woken again."""
+        self.scheduler.unschedule(actor)
+
+    def move_entity(self, entity: Entity, x: int, y: int) -> None:
+        """Move an entity on this map, keeping the spatial index in sync."""
+        self._unindex(entity)
+        old_x, old_y = entity.x, entity.y
+        entity.x = x
+        entity.y = y
+        self.entities_by_location.setdefault((x, y), []).append(entity)
+        if isinstance(entity, Actor):
+            self.actor_store.set_position(entity, x, y)
+        if entity.blocks_movement:
+            self._update_cost_at(old_x, old_y)
+            self._update_cost_at(x, y)
+
+    def _unindex(self, entity: Entity) -> None:
+        location = (entity.x, entity.y)
+        cell = self.entities_by_location[location]
+        cell.remove(entity)
+        if not cell:
+            del self.entities_by_location[location]
+
+    def get_entities_at_location(self, x: int, y: int) -> List[Entity]:
+        """Return every entity at the given location."""
+        return self.entities_by_location.get((x, y), [])
 
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int,
     ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        for entity in self.get_entities_at_location(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
 
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.get_entities_at_location(x, y):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
 
         return None
 
@@ -93,17 +366,32 @@ class GameMap:
 
         # 3. Slice the map arrays to extract only the tiles visible to the camera
         # We use [cam_x : cam_x + viewport_width] to get the correct slice of the world
-        visible_tiles = self.tiles[cam_x: cam_x + viewport_width, cam_y: cam_y + viewport_height]
+        visible_tiles = tile_types.tile_table[
+            self.tiles[cam_x: cam_x + viewport_width, cam_y: cam_y + viewport_height]
+        ]
+        visible = self.visible[cam_x: cam_x + viewport_width, cam_y: cam_y + viewport_height]
 
         console.rgb[0:viewport_width, 0:viewport_height] = np.select(
             condlist=[
-                self.visible[cam_x: cam_x + viewport_width, cam_y: cam_y + viewport_height],
+                visible,
                 self.explored[cam_x: cam_x + viewport_width, cam_y: cam_y + viewport_height]
             ],
             choicelist=[visible_tiles["light"], visible_tiles["dark"]],
             default=tile_types.SHROUD,
         )
 
+        # Decorations are drawn with the tiles, under every entity.
+        if self.decoration_kinds:
+            decorations = self.decorations[
+                cam_x: cam_x + viewport_width, cam_y: cam_y + viewport_height
+            ]
+            xs, ys = np.nonzero((decorations > 0) & visible)
+            kind_index = decorations[xs, ys] - 1
+            glyphs = np.array([ord(kind.char) for kind in self.decoration_kinds])
+            colors = np.array([kind.color for kind in self.decoration_kinds], dtype=np.uint8)
+            console.rgb["ch"][xs, ys] = glyphs[kind_index]
+            console.rgb["fg"][xs, ys] = colors[kind_index]
+
         # 4. Sort entities by render order so corpses stay below actors
         entities_sorted_for_rendering = sorted(
             self.entities, key=lambda x: x.render_order.value
@@ -140,7 +428,8 @@ class GameWorld:
         max_rooms: int,
         room_min_size: int,
         room_max_size: int,
-        current_floor: int = 0
+        current_floor: int = 0,
+        compact_corpses: bool = False,
     ):
         self.engine = engine
 
@@ -154,6 +443,9 @@ class GameWorld:
 
         self.current_floor = current_floor
 
+        # Passed on to the GameMap of each new floor.
+        self.compact_corpses = compact_corpses
+
     def generate_floor(self) -> None:
         from procgen import generate_dungeon
 
@@ -166,4 +458,5 @@ class GameWorld:
             map_width=self.map_width,
             map_height=self.map_height,
             engine=self.engine,
+            compact_corpses=self.compact_corpses,
         )
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Run the game without a window, driven by a bot, to measure engine throughput.
+
+Example:
+    python headless.py run --turns 5000 --bot explorer --seed 1
+"""
+from __future__ import annotations
+
+import argparse
+from collections import deque
+import copy
+import random
+import time
+import tracemalloc
+from typing import Callable, Deque, Optional, Tuple
+
+import actions
+from actions import Action
+import combat_sim
+from engine import Engine
+from entity import Actor, Entity
+import entity_factories
+from game_map import GameMap
+import input_handlers
+from pathfinding import find_path, hierarchical_path
+import procgen
+import setup_game
+import tile_types
+
+DIRECTIONS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+
+class RandomBot:
+    """Bumps in random directions, and sometimes picks up items or waits."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.rng = random.Random(engine.rng.seed)
+
+    def next_action(self) -> Action:
+        player = self.engine.player
+        roll = self.rng.random()
+        if (player.x, player.y) == self.engine.game_map.downstairs_location:
+            return actions.TakeStairsAction(player)
+        if roll < 0.05:
+            return actions.PickupAction(player)
+        if roll < 0.1:
+            return actions.WaitAction(player)
+        return actions.BumpAction(player, *self.rng.choice(DIRECTIONS))
+
+
+class ExplorerBot:
+    """Fights whatever is next to it, otherwise walks to the stairs and descends."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.path: Deque[Tuple[int, int]] = deque()
+        self.path_floor = -1
+        self.rng = random.Random(engine.rng.seed)
+
+    def next_action(self) -> Action:
+        engine = self.engine
+        game_map = engine.game_map
+        player = engine.player
+
+        for dx, dy in DIRECTIONS:
+            if game_map.get_actor_at_location(player.x + dx, player.y + dy):
+                return actions.MeleeAction(player, dx, dy)
+
+        if (player.x, player.y) == game_map.downstairs_location:
+            return actions.TakeStairsAction(player)
+
+        if self.path_floor != engine.game_world.current_floor or not self.path:
+            start, goal = (player.x, player.y), game_map.downstairs_location
+            # Travel over the room graph, searching the whole map only if that fails.
+            path = hierarchical_path(game_map, start, goal)
+            if path is None:
+                cost = game_map.path_cost(0, 0, game_map.width, game_map.height)
+                path = find_path(cost, (0, 0), start, goal)
+            self.path = deque(path or [])
+            self.path_floor = engine.game_world.current_floor
+        if not self.path:
+            return actions.BumpAction(player, *self.rng.choice(DIRECTIONS))
+
+        x, y = self.path[0]
+        if max(abs(x - player.x), abs(y - player.y)) != 1:
+            self.path.clear()  # Knocked off the path, find a new one next turn.
+            return actions.WaitAction(player)
+        if game_map.get_blocking_entity_at_location(x, y) is None:
+            self.path.popleft()
+        return actions.BumpAction(player, x - player.x, y - player.y)
+
+
+BOTS = {"random": RandomBot, "explorer": ExplorerBot}
+
+
+def new_game(seed: Optional[int], compact_corpses: bool) -> Engine:
+    engine = setup_game.new_game(seed)
+    # The first floor is already generated, so set it on both.
+    engine.game_world.compact_corpses = compact_corpses
+    engine.game_map.compact_corpses = compact_corpses
+    return engine
+
+
+def run(args: argparse.Namespace) -> None:
+    """Play `args.turns` turns with a bot and report the turns per second."""
+    seed = args.seed
+    engine = new_game(seed, args.compact_corpses)
+    bot = BOTS[args.bot](engine)
+    handler = input_handlers.MainGameEventHandler(engine)
+
+    turns = attempts = deaths = deepest_floor = 0
+    start = time.perf_counter()
+    while turns < args.turns:
+        attempts += 1
+        if handler.handle_action(bot.next_action()):
+            turns += 1
+        elif attempts > args.turns * 10:
+            break  # The bot is stuck on impossible actions.
+
+        player = engine.player
+        if player.level.requires_level_up:
+            player.level.increase_max_hp()
+        deepest_floor = max(deepest_floor, engine.game_world.current_floor)
+        if not player.is_alive:
+            deaths += 1
+            engine = new_game(None if seed is None else seed + deaths, args.compact_corpses)
+            bot = BOTS[args.bot](engine)
+            handler = input_handlers.MainGameEventHandler(engine)
+    elapsed = time.perf_counter() - start
+
+    print(f"bot:           {args.bot}")
+    print(f"seed:          {seed}")
+    print(f"turns:         {turns}")
+    print(f"seconds:       {elapsed:.2f}")
+    print(f"turns/sec:     {turns / elapsed:.0f}")
+    print(f"deaths:        {deaths}")
+    print(f"deepest floor: {deepest_floor}")
+
+
+def duel(args: argparse.Namespace) -> None:
+    """Simulate melee duels between actor templates and report the results."""
+    engine = setup_game.new_game(args.seed)
+    actors = []
+    for name in args.actors:
+        if name == "player":
+            actors.append(engine.player)  # Equipped with the Quick Start gear.
+        else:
+            actor = getattr(entity_factories, name, None)
+            if not isinstance(actor, Actor):
+                raise SystemExit(f"{name!r} is not an actor in entity_factories.")
+            actors.append(actor)
+
+    generator = engine.rng.generator("combat")
+    start = time.perf_counter()
+    results = combat_sim.simulate_matchups(actors, generator, duels=args.duels)
+    elapsed = time.perf_counter() - start
+    for result in results.values():
+        print(result)
+    print(f"{len(results) * args.duels} duels in {elapsed:.2f} seconds")
+
+
+def spawn(args: argparse.Namespace) -> None:
+    """Populate an open floor with entities and report how long spawning takes."""
+    engine = setup_game.new_game(args.seed)
+    rng = engine.rng.stream("spawn")
+    templates = [
+        template
+        for chances in (procgen.enemy_chances, procgen.item_chances)
+        for spawn_chances in chances.values()
+        for template, _ in spawn_chances
+    ]
+
+    def populate(make_copy: Callable[[Entity], Entity]) -> float:
+        game_map = GameMap(engine, args.size, args.size)
+        game_map.set_tiles((slice(None), slice(None)), tile_types.FLOOR)
+        start = time.perf_counter()
+        for _ in range(args.entities):
+            entity = make_copy(rng.choice(templates))
+            entity.place(rng.randrange(args.size), rng.randrange(args.size), game_map)
+        return time.perf_counter() - start
+
+    for name, make_copy in (
+        ("prototype", lambda template: template.instantiate()),
+        ("deepcopy", copy.deepcopy),
+    ):
+        elapsed = populate(make_copy)
+        print(
+            f"{name:9}: {args.entities} entities in {elapsed * 1000:.1f} ms, "
+            f"{args.entities / elapsed:.0f} entities/sec"
+        )
+
+
+def memory(args: argparse.Namespace) -> None:
+    """Report the memory used per actor and per item, components included."""
+    setup_game.new_game(args.seed)  # Compile the prototypes outside of the measurement.
+    for template in (entity_factories.orc, entity_factories.health_potion):
+        template.instantiate()
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        entities = [template.instantiate() for _ in range(args.entities)]
+        used = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        print(f"{template.name:13}: {used / len(entities):.0f} bytes per entity")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Play with a bot and report turns per second.")
+    run_parser.add_argument("--turns", type=int, default=2000, help="Turns to play.")
+    run_parser.add_argument("--bot", choices=sorted(BOTS), default="explorer")
+    run_parser.add_argument("--seed", type=int, default=None)
+    run_parser.add_argument(
+        "--compact-corpses",
+        action="store_true",
+        help="Leave corpses as tile decorations instead of entities.",
+    )
+    run_parser.set_defaults(func=run)
+
+    duel_parser = commands.add_parser("duel", help="Simulate melee duels between actors.")
+    duel_parser.add_argument(
+        "actors", nargs="+", help='entity_factories actor names, or "player".'
+    )
+    duel_parser.add_argument("--duels", type=int, default=10_000, help="Duels per matchup.")
+    duel_parser.add_argument("--seed", type=int, default=None)
+    duel_parser.set_defaults(func=duel)
+
+    spawn_parser = commands.add_parser(
+        "spawn", help="Time spawning entities from prototypes and with deepcopy."
+    )
+    spawn_parser.add_argument("--entities", type=int, default=10_000)
+    spawn_parser.add_argument("--size", type=int, default=500, help="Width and height of the map.")
+    spawn_parser.add_argument("--seed", type=int, default=None)
+    spawn_parser.set_defaults(func=spawn)
+
+    memory_parser = commands.add_parser("memory", help="Report the memory used per entity.")
+    memory_parser.add_argument("--entities", type=int, default=10_000)
+    memory_parser.add_argument("--seed", type=int, default=None)
+    memory_parser.set_defaults(func=memory)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -655,7 +655,7 @@ class CharacterCreationHandler(AskUserEventHandler):
         if race == "Human":
             # Human: Roll 3d6 in order for all stats
             for stat in self.stat_keys:
-                self.stats[stat] = dice.roll(3, 6)
+                self.stats[stat] = dice.roll(3, 6, self.engine.rng.stream("player"))
         else:
             # Non-Humans: Two stats are fixed at 13, others are 2d6+3
             fixed = {
@@ -668,7 +668,7 @@ class CharacterCreationHandler(AskUserEventHandler):
                 if stat in fixed:
                     self.stats[stat] = 13
                 else:
-                    self.stats[stat] = dice.roll(2, 6) + 3
+                    self.stats[stat] = dice.roll(2, 6, self.engine.rng.stream("player")) + 3
 
     def on_render(self, console: tcod.Console) -> None:
         """Render the character creation menu. Overridden to avoid map rendering crashes."""
@@ -768,8 +768,7 @@ class CharacterCreationHandler(AskUserEventHandler):
 
         # 1. Create a copy of the Dagger from your factory
         import entity_factories
-        import copy
-        starting_weapon = copy.deepcopy(entity_factories.dagger)
+        starting_weapon = entity_factories.dagger.instantiate()
 
         # 2. Give it to the player
         starting_weapon.parent = p.inventory
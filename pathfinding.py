@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+import tcod
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+class FlowField:
+    """
+    A Dijkstra distance map toward a single target, over a window of a GameMap.
+
+    It is computed once and then shared by every actor heading for the same target.
+    Each actor walks downhill on it, so N chasing monsters cost one search, not N.
+    """
+
+    def __init__(
+        self, cost: np.ndarray, origin: Tuple[int, int], target: Tuple[int, int]
+    ):
+        """`cost` is the movement cost window whose top-left corner is `origin` on the map."""
+        self.origin = origin
+        self.target = target
+        self.distance = np.full(cost.shape, UNREACHABLE, dtype=np.int32)
+        self.distance[target[0] - origin[0], target[1] - origin[1]] = 0
+        tcod.path.dijkstra2d(self.distance, cost, cardinal=2, diagonal=3, out=self.distance)
+
+    def _local(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        local_x, local_y = x - self.origin[0], y - self.origin[1]
+        if 0 <= local_x < self.distance.shape[0] and 0 <= local_y < self.distance.shape[1]:
+            return local_x, local_y
+        return None
+
+    def distance_at(self, x: int, y: int) -> Optional[int]:
+        """Return the distance from (x, y) to the target, or None if it can't be reached."""
+        local = self._local(x, y)
+        if local is None or self.distance[local] == UNREACHABLE:
+            return None
+        return int(self.distance[local])
+
+    def path_from(self, x: int, y: int) -> Optional[List[Tuple[int, int]]]:
+        """Return the downhill path from (x, y) to the target, excluding the start.
+
+        Returns None if the target can not be reached from (x, y) inside this field.
+        """
+        local = self._local(x, y)
+        if local is None or self.distance[local] == UNREACHABLE:
+            return None
+        path = tcod.path.hillclimb2d(self.distance, local, True, True)[1:]
+        origin_x, origin_y = self.origin
+        return [(int(i) + origin_x, int(j) + origin_y) for i, j in path]
+
+
+def find_path(
+    cost: np.ndarray,
+    origin: Tuple[int, int],
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+) -> Optional[List[Tuple[int, int]]]:
+    """Search the cost window whose top-left corner is `origin` for a path.
+
+    Returns the path from `start` to `goal` excluding `start`, or None if there is none.
+    """
+    origin_x, origin_y = origin
+    graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
+    pathfinder = tcod.path.Pathfinder(graph)
+    pathfinder.add_root((start[0] - origin_x, start[1] - origin_y))
+    path = pathfinder.path_to((goal[0] - origin_x, goal[1] - origin_y)).tolist()
+    if path[0] != [start[0] - origin_x, start[1] - origin_y]:
+        return None  # Unreachable, the pathfinder only returned the goal.
+    return [(i + origin_x, j + origin_y) for i, j in path[1:]]
+
+
+Window = Tuple[int, int, int, int]  # A half-open (x1, y1, x2, y2) rectangle.
+
+
+class Edge(NamedTuple):
+    """A corridor leading to a neighboring room."""
+
+    window: Window  # Contains both rooms and the corridor between them.
+    exit: Tuple[int, int]  # The tile of this room where the corridor leaves it.
+    door: Tuple[int, int]  # The tile of the neighbor where the corridor enters it.
+    length: int  # Steps along the corridor from `exit` to `door`.
+
+
+def _line_length(start: Tuple[int, int], end: Tuple[int, int]) -> int:
+    """Return the number of steps between two tiles along a tunnel.
+
+    Tunnels are made of horizontal and vertical lines and never turn back, so this is
+    the distance in x plus the distance in y.
+    """
+    return abs(end[0] - start[0]) + abs(end[1] - start[1])
+
+
+def _line_point(start: Tuple[int, int], end: Tuple[int, int], step: int) -> Tuple[int, int]:
+    """Return the tile `step` steps along a horizontal or vertical line."""
+    dx = (end[0] > start[0]) - (end[0] < start[0])
+    dy = (end[1] > start[1]) - (end[1] < start[1])
+    return start[0] + dx * step, start[1] + dy * step
+
+
+def _tunnel_point(
+    legs: List[Tuple[Tuple[int, int], Tuple[int, int]]], leg_steps: List[int], step: int
+) -> Tuple[int, int]:
+    """Return the tile `step` steps along a tunnel, whose legs start at `leg_steps`."""
+    for (start, end), leg_step in zip(legs, leg_steps):
+        if step <= leg_step + _line_length(start, end):
+            return _line_point(start, end, step - leg_step)
+    raise ValueError(f"Step {step} is past the end of the tunnel.")
+
+
+def _crossings(
+    lines: List[Tuple[int, int, int, int, int]], segment_count: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return the pairs of segments whose lines share a tile, as arrays first, second, x, y.
+
+    Each `first` is less than its `second`, and (x, y) is one of the tiles they share.
+
+    Every tile of every line is encoded as tile * segment_count + segment, and sorting
+    those puts the segments sharing a tile next to each other.
+    """
+    no_crossings = (np.zeros(0, np.int64),) * 4
+    if not lines:
+        return no_crossings
+    height = max(max(line[1], line[3]) for line in lines) + 1
+    codes = np.empty(sum(x2 - x1 + y2 - y1 + 1 for x1, y1, x2, y2, _ in lines), np.int64)
+    position = 0
+    for x1, y1, x2, y2, segment in lines:
+        # Tiles are numbered x * height + y, along a horizontal line they are height apart.
+        tiles = np.arange(x1 * height + y1, x2 * height + y2 + 1, height if y1 == y2 else 1)
+        codes[position:position + len(tiles)] = tiles * segment_count + segment
+        position += len(tiles)
+    codes.sort()
+    tiles = codes // segment_count
+    segments = codes - tiles * segment_count
+    del codes
+
+    # Compare each entry with the next one, then the one after that, and so on until
+    # no tile is shared by that many segments.
+    pairs = []
+    pair_tiles = []
+    distance = 1
+    while True:
+        shared = tiles[:-distance] == tiles[distance:]
+        if not shared.any():
+            break
+        pairs.append(segments[:-distance][shared] * segment_count + segments[distance:][shared])
+        pair_tiles.append(tiles[:-distance][shared])
+        distance += 1
+    if not pairs:
+        return no_crossings
+    unique_pairs, first_index = np.unique(np.concatenate(pairs), return_index=True)
+    crossing_tiles = np.concatenate(pair_tiles)[first_index]
+    return (*np.divmod(unique_pairs, segment_count), *np.divmod(crossing_tiles, height))
+
+
+def _union(*windows: Window) -> Window:
+    x1s, y1s, x2s, y2s = zip(*windows)
+    return min(x1s), min(y1s), max(x2s), max(y2s)
+
+
+class RoomGraph:
+    """
+    The rooms of a generated dungeon and the corridors connecting them.
+
+    Rooms are stored as (x1, y1, x2, y2) rectangles, the same bounds as
+    procgen.RectangularRoom, with their floor strictly inside those bounds.  Each edge
+    is an Edge, keeping the window which contains both rooms and the shortest corridor
+    between them, and where that corridor leaves and enters the rooms.
+    """
+
+    BUCKET_SIZE = 16  # Size of the spatial buckets used to find the room at a tile.
+
+    def __init__(self) -> None:
+        self.rooms: List[Tuple[int, int, int, int]] = []
+        self.neighbors: List[Dict[int, Edge]] = []
+        self.buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def add_room(self, x1: int, y1: int, x2: int, y2: int) -> int:
+        """Add a room and return its index."""
+        index = len(self.rooms)
+        self.rooms.append((x1, y1, x2, y2))
+        self.neighbors.append({})
+        size = self.BUCKET_SIZE
+        for bucket_x in range(x1 // size, x2 // size + 1):
+            for bucket_y in range(y1 // size, y2 // size + 1):
+                self.buckets.setdefault((bucket_x, bucket_y), []).append(index)
+        return index
+
+    def connect(
+        self,
+        room_a: int,
+        room_b: int,
+        window: Window,
+        door_a: Tuple[int, int],
+        door_b: Tuple[int, int],
+        length: int,
+    ) -> None:
+        """Record a corridor between two rooms, which lies inside `window`.
+
+        `door_a` and `door_b` are the tiles of each room, floor or dug out wall, where the
+        corridor enters it.  `length` is the number of steps between them.
+        """
+        edge = self.neighbors[room_a].get(room_b)
+        if edge is not None and edge.length <= length:
+            return  # Keep the shortest corridor.
+        window = _union(window, self.bounds(room_a), self.bounds(room_b))
+        self.neighbors[room_a][room_b] = Edge(window, door_a, door_b, length)
+        self.neighbors[room_b][room_a] = Edge(window, door_b, door_a, length)
+
+    def add_corridors(self, tunnels: Iterable[Sequence[Tuple[int, int]]]) -> None:
+        """Connect the rooms which follow each other along each tunnel.
+
+        Each tunnel is given by its start, the points where it turns and its end, joined
+        by horizontal or vertical lines.  Rooms whose corridors cross each other are
+        connected as well.
+        """
+        # Each segment is a corridor between two rooms, as its window and the
+        # (room, door) at each of its ends.
+        segments: List[Tuple[Window, Tuple[Tuple[int, Tuple[int, int]], ...]]] = []
+        # The lines of tiles making up each segment's corridor, as inclusive
+        # (x1, y1, x2, y2, segment).  A corridor turning a corner has two lines.
+        lines: List[Tuple[int, int, int, int, int]] = []
+        for tunnel in tunnels:
+            legs = list(zip(tunnel, tunnel[1:]))
+            # Steps along the tunnel from its start to the start of each leg.  A corner is
+            # the last step of one leg, the next leg starts one step after it.
+            leg_steps = []
+            steps = 0
+            for start, end in legs:
+                leg_steps.append(steps)
+                steps += _line_length(start, end)
+
+            # The rooms the tunnel passes through, as (first step, last step, room).
+            visits = []
+            for i, (start, end) in enumerate(legs):
+                for first, last, room in self._rooms_along(start, end):
+                    first = max(first, 1 if i else 0)
+                    if first <= last:
+                        visits.append((leg_steps[i] + first, leg_steps[i] + last, room))
+            visits.sort()
+
+            previous: Optional[Tuple[int, int, int]] = None
+            for first, last, room in visits:
+                if previous is not None and room == previous[2]:
+                    previous = (previous[0], last, room)  # Back into the same room.
+                    continue
+                if previous is not None:
+                    # The corridor is every step strictly between the two rooms, there is
+                    # none when their walls touch.
+                    corridor_first, corridor_last = previous[1] + 1, first - 1
+                    corridor: List[Tuple[int, int, int, int]] = []
+                    for i, ((start, end), leg_step) in enumerate(zip(legs, leg_steps)):
+                        low = max(corridor_first, leg_step + (1 if i else 0))
+                        high = min(corridor_last, leg_step + _line_length(start, end))
+                        if low <= high:
+                            x1, y1 = _line_point(start, end, low - leg_step)
+                            x2, y2 = _line_point(start, end, high - leg_step)
+                            corridor.append((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+                    window = _union(
+                        self.bounds(previous[2]),
+                        self.bounds(room),
+                        *((x1, y1, x2 + 1, y2 + 1) for x1, y1, x2, y2 in corridor),
+                    )
+                    door_a = _tunnel_point(legs, leg_steps, previous[1])
+                    door_b = _tunnel_point(legs, leg_steps, first)
+                    length = first - previous[1]
+                    self.connect(previous[2], room, window, door_a, door_b, length)
+                    lines.extend((*line, len(segments)) for line in corridor)
+                    segments.append((window, ((previous[2], door_a), (room, door_b))))
+                previous = (first, last, room)
+
+        first, second, x, y = _crossings(lines, len(segments))
+        if not len(first):
+            return
+        # Through a crossing, either end of one segment reaches either end of the other.
+        # Many crossings connect the same two rooms, so the length of every way is
+        # computed at once and only the shortest way between each two rooms is kept.
+        ends = np.array(
+            [[(room, door_x, door_y) for room, (door_x, door_y) in ends] for _, ends in segments]
+        )
+        ways = ((0, 0), (0, 1), (1, 0), (1, 1))  # The ends of the first and second segment.
+        room_pairs = []
+        lengths = []
+        for end_a, end_b in ways:
+            room_a, door_a_x, door_a_y = ends[first, end_a].T
+            room_b, door_b_x, door_b_y = ends[second, end_b].T
+            # Tunnels never turn back, so these are the steps along them.
+            lengths.append(
+                abs(x - door_a_x) + abs(y - door_a_y) + abs(x - door_b_x) + abs(y - door_b_y)
+            )
+            room_pairs.append(
+                np.minimum(room_a, room_b) * len(self.rooms) + np.maximum(room_a, room_b)
+            )
+        all_pairs = np.concatenate(room_pairs)
+        all_lengths = np.concatenate(lengths)
+        order = np.lexsort((all_lengths, all_pairs))
+        is_shortest = np.ones(len(order), dtype=bool)
+        is_shortest[1:] = all_pairs[order[1:]] != all_pairs[order[:-1]]
+
+        first_list, second_list = first.tolist(), second.tolist()
+        for way in order[is_shortest].tolist():
+            end_a, end_b = ways[way // len(first_list)]
+            crossing = way % len(first_list)
+            first_window, first_ends = segments[first_list[crossing]]
+            second_window, second_ends = segments[second_list[crossing]]
+            room_a, door_a = first_ends[end_a]
+            room_b, door_b = second_ends[end_b]
+            if room_a != room_b:
+                window = _union(first_window, second_window)
+                self.connect(room_a, room_b, window, door_a, door_b, int(all_lengths[way]))
+
+    def _rooms_along(
+        self, start: Tuple[int, int], end: Tuple[int, int]
+    ) -> List[Tuple[int, int, int]]:
+        """Return the rooms whose floor or walls a straight line passes through.
+
+        A line along a wall digs it out, opening the room onto the corridor.  Each room
+        is returned as (first step, last step, room), counting steps from `start`.
+        """
+        (x1, y1), (x2, y2) = start, end
+        low_x, high_x, low_y, high_y = min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2)
+        size = self.BUCKET_SIZE
+        candidates: Dict[int, None] = {}
+        for bucket_x in range(low_x // size, high_x // size + 1):
+            for bucket_y in range(low_y // size, high_y // size + 1):
+                candidates.update(dict.fromkeys(self.buckets.get((bucket_x, bucket_y), ())))
+
+        rooms = []
+        for room in candidates:
+            room_x1, room_y1, room_x2, room_y2 = self.rooms[room]
+            # The tiles of the room which are on the line.
+            on_x1, on_x2 = max(room_x1, low_x), min(room_x2, high_x)
+            on_y1, on_y2 = max(room_y1, low_y), min(room_y2, high_y)
+            if on_x1 > on_x2 or on_y1 > on_y2:
+                continue
+            if x1 != x2:
+                steps = abs(on_x1 - x1), abs(on_x2 - x1)
+            else:
+                steps = abs(on_y1 - y1), abs(on_y2 - y1)
+            rooms.append((min(steps), max(steps), room))
+        return rooms
+
+    def bounds(self, room: int) -> Window:
+        """Return the half-open window covering a room, including its walls."""
+        x1, y1, x2, y2 = self.rooms[room]
+        return x1, y1, x2 + 1, y2 + 1
+
+    def room_at(self, x: int, y: int) -> Optional[int]:
+        """Return the index of the room whose floor contains (x, y), if any."""
+        size = self.BUCKET_SIZE
+        for index in self.buckets.get((x // size, y // size), ()):
+            x1, y1, x2, y2 = self.rooms[index]
+            if x1 < x < x2 and y1 < y < y2:
+                return index
+        return None
+
+    def route(
+        self, start_room: int, start: Tuple[int, int], goal_room: int, goal: Tuple[int, int]
+    ) -> Optional[List[int]]:
+        """Return the rooms to pass through from `start` to `goal`, both rooms included.
+
+        This is an A* search over the room graph.  Going to a neighbor costs the distance
+        across the room from where it was entered to where the corridor leaves it, plus
+        the length of the corridor.
+        """
+        distances: Dict[int, int] = {start_room: 0}
+        entered_at: Dict[int, Tuple[int, int]] = {start_room: start}
+        came_from: Dict[int, int] = {start_room: start_room}
+        frontier = [(0, 0, start_room)]
+        while frontier:
+            _, distance, room = heapq.heappop(frontier)
+            if room == goal_room:
+                route = [room]
+                while room != start_room:
+                    room = came_from[room]
+                    route.append(room)
+                route.reverse()
+                return route
+            if distance > distances[room]:
+                continue  # Stale entry.
+            x, y = entered_at[room]
+            for neighbor, edge in self.neighbors[room].items():
+                exit_x, exit_y = edge.exit
+                new_distance = distance + max(abs(exit_x - x), abs(exit_y - y)) + edge.length
+                if new_distance < distances.get(neighbor, new_distance + 1):
+                    distances[neighbor] = new_distance
+                    entered_at[neighbor] = edge.door
+                    came_from[neighbor] = room
+                    # The straight distance left to the goal never overestimates.
+                    door_x, door_y = edge.door
+                    estimate = new_distance + max(abs(goal[0] - door_x), abs(goal[1] - door_y))
+                    heapq.heappush(frontier, (estimate, new_distance, neighbor))
+        return None
+
+
+def hierarchical_path(
+    game_map: GameMap, start: Tuple[int, int], goal: Tuple[int, int]
+) -> Optional[List[Tuple[int, int]]]:
+    """Find a path using the map's room graph, excluding `start`.
+
+    The route is planned over the room graph first.  Then each leg, from the current
+    room to the door of the next one, is searched only inside the window covering
+    those two rooms and the corridor procgen dug between them.
+
+    Returns None if either end is not inside a room or a leg can't be found, in which
+    case the caller should fall back to a full search.
+    """
+    room_graph = game_map.room_graph
+    if room_graph is None:
+        return None
+    start_room = room_graph.room_at(*start)
+    goal_room = room_graph.room_at(*goal)
+    if start_room is None or goal_room is None:
+        return None
+    route = room_graph.route(start_room, start, goal_room, goal)
+    if route is None:
+        return None
+
+    path: List[Tuple[int, int]] = []
+    current = start
+    for i, room in enumerate(route):
+        if i == len(route) - 1:
+            leg_goal = goal
+            x1, y1, x2, y2 = room_graph.bounds(room)
+        else:
+            edge = room_graph.neighbors[room][route[i + 1]]
+            leg_goal = edge.door
+            x1, y1, x2, y2 = edge.window
+        leg = find_path(game_map.path_cost(x1, y1, x2, y2), (x1, y1), current, leg_goal)
+        if leg is None:
+            return None
+        path.extend(leg)
+        current = leg_goal
+    return path
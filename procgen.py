@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import random
-from typing import Dict, Iterator, List, Tuple, TYPE_CHECKING
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
 
-import tcod
+import numpy as np  # type: ignore
 
+from chunked_array import ChunkedArray
 import entity_factories
 from game_map import GameMap
+from pathfinding import RoomGraph
 import tile_types
 
 
@@ -59,6 +61,7 @@ def get_entities_at_random(
     weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]],
     number_of_entities: int,
     floor: int,
+    rng: random.Random,
 ) -> List[Entity]:
     entity_weighted_chances = {}
 
@@ -75,7 +78,7 @@ def get_entities_at_random(
     entities = list(entity_weighted_chances.keys())
     entity_weighted_chance_values = list(entity_weighted_chances.values())
 
-    chosen_entities = random.choices(
+    chosen_entities = rng.choices(
         entities, weights=entity_weighted_chance_values, k=number_of_entities
     )
 
@@ -101,6 +104,11 @@ class RectangularRoom:
         """Return the inner area of this room as a 2D array index."""
         return slice(self.x1 + 1, self.x2), slice(self.y1 + 1, self.y2)
 
+    @property
+    def outer(self) -> Tuple[slice, slice]:
+        """Return this room including its walls as a 2D array index."""
+        return slice(self.x1, self.x2 + 1), slice(self.y1, self.y2 + 1)
+
     def intersects(self, other: RectangularRoom) -> bool:
         """Return True if this room overlaps with another RectangularRoom."""
         return (
@@ -111,48 +119,53 @@ class RectangularRoom:
         )
 
 
-def place_entities(room: RectangularRoom, dungeon: GameMap, floor_number: int,) -> None:
-    number_of_monsters = random.randint(
+def place_entities(
+    room: RectangularRoom, dungeon: GameMap, floor_number: int, rng: random.Random,
+) -> None:
+    number_of_monsters = rng.randint(
         0, get_max_value_for_floor(max_monsters_by_floor, floor_number)
     )
-    number_of_items = random.randint(
+    number_of_items = rng.randint(
         0, get_max_value_for_floor(max_items_by_floor, floor_number)
     )
 
     monsters: List[Entity] = get_entities_at_random(
-        enemy_chances, number_of_monsters, floor_number
+        enemy_chances, number_of_monsters, floor_number, rng
     )
     items: List[Entity] = get_entities_at_random(
-        item_chances, number_of_items, floor_number
+        item_chances, number_of_items, floor_number, rng
     )
 
     for entity in monsters + items:
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
 
-        # Change 'entity' to 'e' inside the any() generator
-        if not any(e.x == x and e.y == y for e in dungeon.entities):
+        if not dungeon.get_entities_at_location(x, y):
             entity.spawn(dungeon, x, y)
 
 
 def tunnel_between(
-    start: Tuple[int, int], end: Tuple[int, int]
-) -> Iterator[Tuple[int, int]]:
-    """Return an L-shaped tunnel between these two points."""
+    start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
+) -> List[Tuple[int, int]]:
+    """Return an L-shaped tunnel between these two points, as its start, corner and end.
+
+    The tunnel runs in a straight line from each of these points to the next.
+    """
     x1, y1 = start
     x2, y2 = end
-    if random.random() < 0.5:  # 50% chance.
+    if rng.random() < 0.5:  # 50% chance.
         # Move horizontally, then vertically.
         corner_x, corner_y = x2, y1
     else:
         # Move vertically, then horizontally.
         corner_x, corner_y = x1, y2
+    return [start, (corner_x, corner_y), end]
+
 
-    # Generate the coordinates for this tunnel.
-    for x, y in tcod.los.bresenham((x1, y1), (corner_x, corner_y)).tolist():
-        yield x, y
-    for x, y in tcod.los.bresenham((corner_x, corner_y), (x2, y2)).tolist():
-        yield x, y
+def straight_line(start: Tuple[int, int], end: Tuple[int, int]) -> Tuple[slice, slice]:
+    """Return a horizontal or vertical line, both ends included, as a 2D array index."""
+    (x1, y1), (x2, y2) = start, end
+    return slice(min(x1, x2), max(x1, x2) + 1), slice(min(y1, y2), max(y1, y2) + 1)
 
 
 def generate_dungeon(
@@ -162,49 +175,71 @@ def generate_dungeon(
     map_width: int,
     map_height: int,
     engine: Engine,
+    compact_corpses: bool = False,
 ) -> GameMap:
     """Generate a new dungeon map."""
     player = engine.player
-    dungeon = GameMap(engine, map_width, map_height, entities=[player])
+    dungeon = GameMap(
+        engine, map_width, map_height, entities=[player], compact_corpses=compact_corpses
+    )
+    map_rng = engine.rng.stream("map")
+    spawn_rng = engine.rng.stream("spawn")
 
     rooms: List[RectangularRoom] = []
+    # Tiles covered by a room or its walls.  Rooms intersect exactly when the outer
+    # area of one covers a tile of the other.
+    if dungeon.chunked:
+        occupied: Any = ChunkedArray((dungeon.width, dungeon.height), bool, False)
+    else:
+        occupied = np.zeros((dungeon.width, dungeon.height), dtype=bool, order="F")
+    # Every tunnel dug, so rooms placed over them later are connected too.
+    tunnels: List[List[Tuple[int, int]]] = []
 
     center_of_last_room = (0, 0)
 
     for r in range(max_rooms):
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = map_rng.randint(room_min_size, room_max_size)
+        room_height = map_rng.randint(room_min_size, room_max_size)
 
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
+        x = map_rng.randint(0, dungeon.width - room_width - 1)
+        y = map_rng.randint(0, dungeon.height - room_height - 1)
 
         # "RectangularRoom" class makes rectangles easier to work with
         new_room = RectangularRoom(x, y, room_width, room_height)
 
-        # Run through the other rooms and see if they intersect with this one.
-        if any(new_room.intersects(other_room) for other_room in rooms):
+        # Check the area of this room against the areas of all the other rooms.
+        if occupied[new_room.outer].any():
             continue  # This room intersects, so go to the next attempt.
         # If there are no intersections then the room is valid.
+        occupied[new_room.outer] = True
 
         # Dig out this rooms inner area.
-        dungeon.tiles[new_room.inner] = tile_types.floor
+        dungeon.set_tiles(new_room.inner, tile_types.FLOOR)
 
         if len(rooms) == 0:
             # The first room, where the player starts.
             player.place(*new_room.center, dungeon)
         else:  # All rooms after the first.
             # Dig out a tunnel between this room and the previous one.
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
+            tunnel = tunnel_between(rooms[-1].center, new_room.center, map_rng)
+            for start, end in zip(tunnel, tunnel[1:]):
+                dungeon.set_tiles(straight_line(start, end), tile_types.FLOOR)
+            tunnels.append(tunnel)
 
             center_of_last_room = new_room.center
 
-        place_entities(new_room, dungeon, engine.game_world.current_floor)
+        place_entities(new_room, dungeon, engine.game_world.current_floor, spawn_rng)
 
-        dungeon.tiles[center_of_last_room] = tile_types.down_stairs
+        dungeon.set_tiles(center_of_last_room, tile_types.DOWN_STAIRS)
         dungeon.downstairs_location = center_of_last_room
 
         # Finally, append the new room to the list.
         rooms.append(new_room)
 
+    # Keep the room connectivity for hierarchical pathfinding.
+    dungeon.room_graph = RoomGraph()
+    for room in rooms:
+        dungeon.room_graph.add_room(room.x1, room.y1, room.x2, room.y2)
+    dungeon.room_graph.add_corridors(tunnels)
+
     return dungeon
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import copy
+from enum import Enum
+import functools
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TYPE_CHECKING
+import weakref
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+Factory = Callable[[], Any]
+
+# Attribute values of these types are shared between all instances of a prototype.
+IMMUTABLE_TYPES = (type(None), bool, int, float, str, Enum)
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(_is_immutable(item) for item in value)
+    return isinstance(value, IMMUTABLE_TYPES)
+
+
+def _factory(value: Any) -> Factory:
+    """Return a function making new copies of a mutable value."""
+    if type(value) in (list, dict, set) and not value:
+        return type(value)  # Empty containers, such as an inventory's item list.
+    return functools.partial(copy.deepcopy, value)
+
+
+Setter = Callable[[Any, Any], None]
+
+
+def _setter(cls: type, name: str) -> Setter:
+    """Return a function setting an attribute of instances of `cls` directly.
+
+    Slots are set through their descriptors, skipping __setattr__ hooks such as the
+    one of Abilities, which is also the fastest way to set them.
+    """
+    descriptor = getattr(cls, name, None)
+    if isinstance(descriptor, types.MemberDescriptorType):
+        return descriptor.__set__  # type: ignore
+    return functools.partial(_set_attribute, name=name)
+
+
+def _set_attribute(obj: Any, value: Any, name: str) -> None:
+    object.__setattr__(obj, name, value)
+
+
+def _split(
+    cls: type, state: Dict[str, Any]
+) -> Tuple[List[Tuple[Setter, Any]], List[Tuple[Setter, Factory]]]:
+    """Split attributes into immutable ones, which can be shared, and factories for the rest."""
+    shared = [
+        (_setter(cls, name), value) for name, value in state.items() if _is_immutable(value)
+    ]
+    copied = [
+        (_setter(cls, name), _factory(value))
+        for name, value in state.items()
+        if not _is_immutable(value)
+    ]
+    return shared, copied
+
+
+class Prototype:
+    """
+    A template entity compiled into flat state, to build copies without copy.deepcopy.
+
+    The template's attributes are split into plain values, components (objects whose
+    `parent` is the template) and an AI (an object whose `entity` is the template).
+    build() creates each object with __new__ and fills in its slots directly.
+    Immutable values are shared, empty containers such as an inventory's item list
+    are created new, and anything else is deep copied on its own.
+    """
+
+    def __init__(self, template: Entity):
+        self.entity_class: Type[Entity] = type(template)
+        # (setter on the entity, class, shared values, factories, parent setter).
+        self.components: List[
+            Tuple[Setter, type, List[Tuple[Setter, Any]], List[Tuple[Setter, Factory]], Setter]
+        ] = []
+        self.ai: Optional[Tuple[Setter, Any]] = None  # Setter on the entity and class.
+        entity_state: Dict[str, Any] = {}
+        for name, value in template.__getstate__().items():
+            if name == "parent":
+                continue
+            if getattr(value, "parent", None) is template:
+                # The parent back-reference is set again on build.
+                component_class = type(value)
+                component_state = {
+                    key: item
+                    for key, item in value.__getstate__().items()
+                    if item is not template
+                }
+                self.components.append(
+                    (
+                        _setter(self.entity_class, name),
+                        component_class,
+                        *_split(component_class, component_state),
+                        _setter(component_class, "parent"),
+                    )
+                )
+            elif getattr(value, "entity", None) is template:
+                self.ai = (_setter(self.entity_class, name), type(value))
+            else:
+                entity_state[name] = value
+        self.shared, self.copied = _split(self.entity_class, entity_state)
+
+    def build(self) -> Entity:
+        """Return a new entity, with new components, which isn't placed anywhere yet."""
+        entity = self.entity_class.__new__(self.entity_class)
+        for setter, value in self.shared:
+            setter(entity, value)
+        for setter, factory in self.copied:
+            setter(entity, factory())
+        for set_component, component_class, shared, copied, set_parent in self.components:
+            component = component_class.__new__(component_class)
+            for setter, value in shared:
+                setter(component, value)
+            for setter, factory in copied:
+                setter(component, factory())
+            set_parent(component, entity)
+            set_component(entity, component)
+        if self.ai is not None:
+            set_ai, ai_class = self.ai
+            set_ai(entity, ai_class(entity))
+        return entity
+
+
+_prototypes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def compile_prototype(template: Entity) -> Prototype:
+    """Return the prototype of a template, compiling it on first use.
+
+    Templates are treated as constants, changes made after the first compile are not
+    picked up.
+    """
+    prototype = _prototypes.get(template)
+    if prototype is None:
+        prototype = _prototypes[template] = Prototype(template)
+    return prototype
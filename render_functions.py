@@ -18,11 +18,12 @@ def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
     if not game_map.in_bounds(x, y) or not game_map.explored[x, y]:
         return ""
 
-    entities_at_location = [
-        entity for entity in game_map.entities if entity.x == x and entity.y == y
-    ]
+    entities_at_location = game_map.get_entities_at_location(x, y)
 
     lines = []
+    decoration = game_map.get_decoration_at_location(x, y)
+    if decoration:
+        lines.append(decoration.name.capitalize())
     for entity in entities_at_location:
         # Start with the name
         name_str = entity.name.capitalize()
@@ -30,17 +31,17 @@ def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
         # Check if the entity has abilities (is an Actor)
         if hasattr(entity, "abilities") and entity.abilities:
             a = entity.abilities
-            f = entity.fighter
+            block = entity.fighter.stats
 
             # Calculate the display damage range
-            low = max(1, f.min_damage)
-            high = max(1, f.max_damage)
+            low = max(1, block.min_damage)
+            high = max(1, block.max_damage)
 
             # Build the stat string using the Abilities attributes
             # Use uppercase labels to keep it readable
             stats = (
                 f"(STR:{a.str} DEX:{a.dex} CON:{a.con} INT:{a.int} WIS:{a.wis} CHA:{a.cha} | "
-                f"AC:{f.armor_class} Dmg:{low}-{high})"
+                f"AC:{block.armor_class} Dmg:{low}-{high})"
             )
             name_str = f"{name_str} {stats}"
 
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+
+NORMAL_SPEED = 100  # An actor with this speed acts once per player turn.
+TURN_TIME = 100  # Game time taken by one action at NORMAL_SPEED.
+
+
+def action_delay(actor: Actor) -> int:
+    """Return the game time an action takes this actor, faster actors wait less."""
+    return TURN_TIME * NORMAL_SPEED // max(1, actor.speed)
+
+
+class TurnScheduler:
+    """
+    Priority queue of the actors waiting to act, keyed by the game time of their next action.
+
+    Entries are (time, sequence, actor) tuples in a heap, the sequence number keeps actors
+    due at the same time in the order they were scheduled.  Unscheduling an actor only
+    forgets its live sequence number, the stale heap entry is skipped when it is popped.
+    """
+
+    def __init__(self) -> None:
+        self.time = 0  # The game time of the action being resolved.
+        self.queue: List[Tuple[int, int, Actor]] = []
+        # The sequence number of each scheduled actor's live heap entry.
+        self.entries: Dict[Actor, int] = {}
+        self.next_sequence = 0
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Actor]:
+        return iter(self.entries)
+
+    def schedule(self, actor: Actor, time: int) -> None:
+        """Schedule the next action of an actor at `time`, replacing any earlier entry."""
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        self.entries[actor] = sequence
+        heapq.heappush(self.queue, (time, sequence, actor))
+
+    def unschedule(self, actor: Actor) -> None:
+        """Remove an actor from the schedule."""
+        if self.entries.pop(actor, None) is None:
+            return
+        if len(self.queue) > 2 * len(self.entries) + 64:
+            # Mostly stale entries, drop them.
+            self.queue = [entry for entry in self.queue if self.entries.get(entry[2]) == entry[1]]
+            heapq.heapify(self.queue)
+
+    def pop(self, until: int) -> Optional[Actor]:
+        """Return the next actor due to act at or before `until`, or None.
+
+        The clock moves to the time of that action.  The actor stays in the schedule
+        without a pending action, the caller should schedule or unschedule it again.
+        """
+        queue = self.queue
+        while queue and queue[0][0] <= until:
+            time, sequence, actor = heapq.heappop(queue)
+            if self.entries.get(actor) == sequence:
+                self.time = time
+                return actor
+        return None
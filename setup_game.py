@@ -2,7 +2,6 @@
 from __future__ import annotations
 from tcod import libtcodpy
 
-import copy
 import lzma
 import pickle
 import traceback
@@ -11,8 +10,9 @@ from typing import Optional
 import tcod
 
 import color
-from engine import Engine
+from engine import Engine, SAVE_HEADER
 import entity_factories
+import exceptions
 from game_map import GameWorld
 import input_handlers
 
@@ -20,10 +20,12 @@ import input_handlers
 background_image = tcod.image.load("menu_background.png")[:, :, :3]
 
 
-def engine_base_setup() -> Engine:
+def engine_base_setup(seed: Optional[int] = None) -> Engine:
     """
     Sets up the engine and player template without generating the world yet.
     Used by both Quick Start and Manual Character Creation.
+
+    Games started with the same seed play out the same given the same inputs.
     """
     map_width = 125
     map_height = 125
@@ -32,8 +34,9 @@ def engine_base_setup() -> Engine:
     room_min_size = 6
     max_rooms = 30
 
-    player = copy.deepcopy(entity_factories.player)
-    engine = Engine(player=player)
+    player = entity_factories.player.instantiate()
+    engine = Engine(player=player, seed=seed)
+    player.fighter.roll_hit_points(engine.rng.stream("spawn"))
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -47,14 +50,14 @@ def engine_base_setup() -> Engine:
     return engine
 
 
-def new_game() -> Engine:
+def new_game(seed: Optional[int] = None) -> Engine:
     """Return a brand new 'Quick Start' game session as an Engine instance."""
-    engine = engine_base_setup()
+    engine = engine_base_setup(seed)
     player = engine.player
 
     # Standard "Quick Start" equipment setup
-    dagger = copy.deepcopy(entity_factories.dagger)
-    leather_armor = copy.deepcopy(entity_factories.leather_armor)
+    dagger = entity_factories.dagger.instantiate()
+    leather_armor = entity_factories.leather_armor.instantiate()
 
     dagger.parent = player.inventory
     leather_armor.parent = player.inventory
@@ -77,9 +80,17 @@ def new_game() -> Engine:
 
 
 def load_game(filename: str) -> Engine:
-    """Load an Engine instance from a file."""
+    """Load an Engine instance from a file.
+
+    Raises exceptions.IncompatibleSave if the file was saved by another version.
+    """
     with open(filename, "rb") as f:
-        engine = pickle.loads(lzma.decompress(f.read()))
+        save_data = lzma.decompress(f.read())
+    if not save_data.startswith(SAVE_HEADER):
+        raise exceptions.IncompatibleSave(
+            "This save is from an older version of the game and can't be loaded."
+        )
+    engine = pickle.loads(memoryview(save_data)[len(SAVE_HEADER):])
     assert isinstance(engine, Engine)
     return engine
 
@@ -127,6 +138,8 @@ class MainMenu(input_handlers.BaseEventHandler):
                 return input_handlers.MainGameEventHandler(load_game("savegame.sav"))
             except FileNotFoundError:
                 return input_handlers.PopupMessage(self, "No saved game to load.")
+            except exceptions.IncompatibleSave as exc:
+                return input_handlers.PopupMessage(self, str(exc))
             except Exception as exc:
                 traceback.print_exc()
                 return input_handlers.PopupMessage(self, f"Failed to load save:\n{exc}")
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import functools
+from typing import Any, Dict, Tuple
+
+
+@functools.lru_cache(maxsize=None)
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Return the names of the attribute slots of a class and all of its bases."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__") and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+class Slotted:
+    """
+    Base for classes with __slots__ which are pickled in save files.
+
+    The pickled state is a plain dict of the attributes which are set.  Attributes are
+    restored with object.__setattr__, skipping __setattr__ hooks while the rest of the
+    object graph is only partly loaded.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(getattr(self, "__dict__", ()))
+        for name in slot_names(type(self)):
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass  # Not set yet, such as the parent of an unplaced template.
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
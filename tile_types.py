@@ -54,3 +54,16 @@ down_stairs = new_tile(
     dark=(ord(">"), (0, 0, 100), (50, 50, 150)),
     light=(ord(">"), (255, 255, 255), (200, 180, 50)),
 )
+
+# Every tile type, in tile id order.  Maps store a uint8 tile id per cell which indexes
+# into this table, instead of a full tile_dt record per cell.
+tile_table = np.array([wall, floor, down_stairs], dtype=tile_dt)
+# The walkable and transparent fields as plain Python bools, to check single tiles
+# without NumPy.
+walkable_table = tuple(tile_table["walkable"].tolist())
+transparent_table = tuple(tile_table["transparent"].tolist())
+
+# Tile ids.
+WALL = 0
+FLOOR = 1
+DOWN_STAIRS = 2